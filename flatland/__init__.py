@@ -16,6 +16,7 @@ deferred_module.shadow(
                 'Decimal',
                 'Dict',
                 'Element',
+                'ElementPool',
                 'Enum',
                 'Float',
                 'Form',
@@ -38,6 +39,7 @@ deferred_module.shadow(
                 'Time',
                 'Unevaluated',
                 'Unset',
+                'ValidationResult',
                 ),
      'signals': (),
      'util': ('Unspecified', 'class_cloner',),
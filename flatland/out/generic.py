@@ -12,14 +12,191 @@ _default_context = {}
 _auto_tags = {}
 _id_invalid_re = re.compile(r'[^A-Za-z0-9_:.\-]')
 
+#: Transforms split into a toggle and a body, by transform function.
+_toggled = {}
+#: The toggle keys of _toggled transforms, in order and as a set.
+_toggles = []
+_toggle_keys = set()
+#: Compiled transform pipelines, by tag name and toggle settings.
+_pipelines = {}
+max_pipelines = 1024
+#: Static attributes of tags, by tag, pipeline, bind and given attributes.
+_skeletons = {}
+max_skeletons = 4096
+#: The ids of the _pipelines whose tags use skeletons.
+_skeletal = set()
+
 
 def transform(tagname, attributes, contents, context, bind):
     """Transform tag *attributes* in-place & return transformed *contents*"""
-    for fn in _transforms:
-        contents = fn(tagname, attributes, contents, context, bind)
+    if attributes and not _toggle_keys.isdisjoint(attributes):
+        # toggles given on the tag itself are resolved transform by transform
+        for fn in _transforms:
+            contents = fn(tagname, attributes, contents, context, bind)
+        return contents
+    return _transform(_pipeline(tagname, context), tagname, attributes,
+                      contents, context, bind)
+
+
+def _transform(pipeline, tagname, attributes, contents, context, bind):
+    """Run the transforms of *pipeline*, as :func:`transform`."""
+    for fn, body, dynamic in pipeline:
+        if body is None:
+            contents = fn(tagname, attributes, contents, context, bind)
+        else:
+            contents = body(tagname, attributes, contents, context, bind,
+                            False)
     return contents
 
 
+def _pipeline(tagname, context):
+    """Return the transforms that may apply to *tagname* in *context*.
+
+    A pipeline holds ``(fn, body, dynamic)`` triples.  The *body* of a
+    toggled transform is called directly, the toggle having been resolved
+    when compiling.  Other transforms have a *body* of None and are called as
+    is.  Only valid for tags with no toggle attributes.
+
+    """
+    key = (tagname, len(_transforms)) + tuple(
+        map(context.__getitem__, _toggles))
+    try:
+        pipeline = _pipelines.get(key)
+    except TypeError:
+        # unhashable toggle settings
+        return _compile_pipeline(tagname, context)
+    if pipeline is None:
+        pipeline = _compile_pipeline(tagname, context)
+        if len(_pipelines) >= max_pipelines:
+            _pipelines.clear()
+            _skeletal.clear()
+        _pipelines[key] = pipeline
+        if _pays_off(pipeline):
+            _skeletal.add(id(pipeline))
+    return pipeline
+
+
+def _compile_pipeline(tagname, context):
+    """Build the :func:`_pipeline` of *tagname* in *context*."""
+    pipeline = []
+    for fn in _transforms:
+        toggled = _toggled.get(fn)
+        if toggled is None:
+            pipeline.append((fn, None, True))
+            continue
+        toggle, auto, body, dynamic = toggled
+        proceed, forced = _pop_toggle(toggle, {}, context)
+        if not proceed:
+            continue
+        if auto is not None and tagname not in _auto_tags[auto]:
+            # unforced, these transforms only apply to their own tags
+            continue
+        pipeline.append((fn, body, dynamic))
+    return tuple(pipeline)
+
+
+def _skeleton(pipeline, tagname, attributes, context, bind):
+    """Return the cached static part of a tag's transformation, or None.
+
+    *pipeline* is the tag's :func:`_pipeline`, or None for tags with toggle
+    attributes.
+
+    The skeleton is a ``(static, fragments, dynamic, opening)`` tuple: the
+    tag's attributes after the static transforms, the serialized ``(value,
+    u' name="value"')`` of each of those by name, the ``(fn, body)`` pairs
+    of the dynamic transforms left to run and, if there are none, the
+    complete ``u'<tag ...'`` opener.  Static transforms depend only on the
+    tag, the settings and given attributes, and the bind's flattened name, so
+    their results are shared by every tag rendered alike.
+
+    Skeletons are only used where they save work: with ordered attributes,
+    as running the static transforms first changes the order of unordered
+    ones, and for pipelines with several static transforms or no dynamic
+    ones.  A lone static transform, such as the default ``auto_name``
+    before ``auto_value``, is cheaper to run than to look up.
+
+    """
+    if id(pipeline) not in _skeletal or not context[u'ordered_attributes']:
+        return None
+    if (tagname == u'input' and
+        attributes.get(u'type') in (u'checkbox', u'radio')):
+        # their ids derive from a value the dynamic transforms may set
+        return None
+    try:
+        key = (tagname, id(pipeline), context[u'domid_format'],
+               bind is None or bind.flattened_name(),
+               frozenset(six.iteritems(attributes)) if attributes else None)
+        entry = _skeletons.get(key)
+    except TypeError:
+        # unhashable attribute values
+        return None
+    if entry is None or entry[0] is not pipeline:
+        entry = pipeline, _build_skeleton(tagname, attributes, context, bind,
+                                          pipeline)
+        if len(_skeletons) >= max_skeletons:
+            _skeletons.clear()
+        _skeletons[key] = entry
+    return entry[1]
+
+
+def _pays_off(pipeline):
+    """True if tags rendered by *pipeline* should use skeletons."""
+    if any(body is None for fn, body, dynamic in pipeline):
+        # unknown transforms must run in order
+        return False
+    static = sum(1 for fn, body, dynamic in pipeline if not dynamic)
+    return static > 1 or static == len(pipeline) == 1
+
+
+def _build_skeleton(tagname, attributes, context, bind, pipeline):
+    """Run the static transforms of *pipeline*."""
+    static = dict(attributes)
+    for fn, body, dynamic in pipeline:
+        if not dynamic:
+            body(tagname, static, None, context, bind, False)
+    fragments = {}
+    for name, value in six.iteritems(static):
+        fragments[name] = value, u''.join(
+            (u' ', name, u'="', _attribute_escape(value), u'"'))
+    dynamic = tuple((fn, body) for fn, body, dynamic in pipeline if dynamic)
+    if dynamic:
+        opening = None
+    else:
+        opening = u''.join([u'<', tagname] + [
+            fragments[name][1] for name, value in _sorted_attributes(static)])
+    return static, fragments, dynamic, opening
+
+
+def toggled_by(toggle, auto=None, dynamic=True):
+    """Mark a transform as *body* guarded by the troolean *toggle* setting.
+
+    *body* takes the transform arguments and a final *forced* flag.  The
+    decorated transform pops *toggle* from the attributes and calls *body*
+    if it is in effect.  Unless forced, a transform with an *auto* tag
+    category does nothing for tags outside of it.
+
+    A transform that is not *dynamic* leaves the contents alone and sets
+    attributes that depend only on the tag name, the given attributes, the
+    toggles and ``domid_format`` settings and the bind's flattened name.
+    Its results are cached; see :func:`_skeleton`.
+
+    """
+    def decorator(body):
+        def toggled_transform(tagname, attributes, contents, context, bind):
+            proceed, forced = _pop_toggle(toggle, attributes, context)
+            if not proceed:
+                return contents
+            return body(tagname, attributes, contents, context, bind, forced)
+        toggled_transform.__name__ = body.__name__
+        toggled_transform.__doc__ = body.__doc__
+        _toggled[toggled_transform] = toggle, auto, body, dynamic
+        if toggle not in _toggle_keys:
+            _toggles.append(toggle)
+            _toggle_keys.add(toggle)
+        return toggled_transform
+    return decorator
+
+
 class Context(object):
     """A stacked key/value mapping."""
 
@@ -27,12 +204,19 @@ class Context(object):
     # versions, see the Generator subclass.
 
     def __init__(self):
-        self._frames = [dict(_default_context)]
+        # each key maps to a stack of its values, innermost last.  frames
+        # list the keys they mask, so push() and pop() only touch those.
+        self._values = dict((key, [value])
+                            for key, value in six.iteritems(_default_context))
+        self._frames = [None]
+
+    def _define(self, defaults):
+        """Add the keys of *defaults* to the base frame."""
+        for key, value in six.iteritems(defaults):
+            self._values[key] = [value]
 
     def push(self, **options):
-        # for this size dict & usage pattern, copying turns out to be cheaper
-        # than directing __getitem__ down through a stack of sparse frames.
-        self._frames.append(self._frames[-1].copy())
+        self._frames.append([])
         try:
             self.update(**options)
         except KeyError:
@@ -42,19 +226,28 @@ class Context(object):
     def pop(self):
         if len(self._frames) == 1:
             raise RuntimeError("Can not pop() the base context frame.")
-        self._frames.pop()
+        values = self._values
+        for key in self._frames.pop():
+            values[key].pop()
 
     def __getitem__(self, key):
-        return self._frames[-1][key]
+        return self._values[key][-1]
 
     def __setitem__(self, key, value):
-        if key not in self:
+        try:
+            stack = self._values[key]
+        except KeyError:
             raise KeyError("%r not permitted in this %s" % (
                 key, self.__class__.__name__))
-        self._frames[-1][key] = value
+        frame = self._frames[-1]
+        if frame is None or key in frame:
+            stack[-1] = value
+        else:
+            frame.append(key)
+            stack.append(value)
 
     def __contains__(self, key):
-        return key in self._frames[-1]
+        return key in self._values
 
     def update(self, *iterable, **kwargs):
         if len(iterable):
@@ -69,7 +262,8 @@ class Context(object):
             self[key] = value
 
     def __repr__(self):
-        return "%s(%r)" % (self.__class__.__name__, self._frames[-1])
+        return "%s(%r)" % (self.__class__.__name__, dict(
+            (key, stack[-1]) for key, stack in six.iteritems(self._values)))
 
 
 class Markup(six.text_type):
@@ -101,9 +295,9 @@ def defaults(data):
 
 @transformer(u'name', (u'input', u'button', u'select', u'textarea', u'form'))
 @defaults({u'auto_name': True})
-def transform_name(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_name', attributes, context)
-    if not proceed or bind is None:
+@toggled_by(u'auto_name', u'name', dynamic=False)
+def transform_name(tagname, attributes, contents, context, bind, forced):
+    if bind is None:
         return contents
 
     bound_name = bind.flattened_name()
@@ -118,10 +312,10 @@ def transform_name(tagname, attributes, contents, context, bind):
 
 @transformer(u'value', (u'button', u'input', u'option', u'textarea'))
 @defaults({u'auto_value': True})
-def transform_value(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_value', attributes, context)
+@toggled_by(u'auto_value', u'value')
+def transform_value(tagname, attributes, contents, context, bind, forced):
     # Abort on unbound tags.
-    if not proceed or bind is None:
+    if bind is None:
         return contents
 
     if not forced and tagname not in _auto_tags[u'value']:
@@ -182,11 +376,8 @@ def transform_value(tagname, attributes, contents, context, bind):
 
 @transformer(u'id', (u'input', u'button', u'select', u'textarea'))
 @defaults({u'auto_domid': False, u'domid_format': u'f_%s'})
-def transform_domid(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_domid', attributes, context)
-    if not proceed:
-        return contents
-
+@toggled_by(u'auto_domid', u'id', dynamic=False)
+def transform_domid(tagname, attributes, contents, context, bind, forced):
     current = attributes.get(u'id')
     if forced or current is None and tagname in _auto_tags[u'id']:
         raw_id = _generate_raw_domid(tagname, attributes, bind)
@@ -198,9 +389,9 @@ def transform_domid(tagname, attributes, contents, context, bind):
 
 @transformer(u'for', (u'label',))
 @defaults({u'auto_for': False})
-def transform_for(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_for', attributes, context)
-    if not proceed or bind is None:
+@toggled_by(u'auto_for', u'for', dynamic=False)
+def transform_for(tagname, attributes, contents, context, bind, forced):
+    if bind is None:
         return contents
 
     current = attributes.get(u'for')
@@ -214,11 +405,9 @@ def transform_for(tagname, attributes, contents, context, bind):
 
 @transformer(u'tabindex', (u'input', u'button', u'select', u'textarea'))
 @defaults({u'auto_tabindex': False, u'tabindex': 0})
-def transform_tabindex(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_tabindex', attributes, context)
-    if not proceed:
-        return contents
-
+# dynamic, as each tag takes the next tabindex
+@toggled_by(u'auto_tabindex', u'tabindex')
+def transform_tabindex(tagname, attributes, contents, context, bind, forced):
     tabindex = context[u'tabindex']
     if tabindex == 0:
         return contents
@@ -232,13 +421,9 @@ def transform_tabindex(tagname, attributes, contents, context, bind):
 
 
 @defaults({u'auto_filter': False, u'filters': ()})
-def transform_filters(tagname, attributes, contents, context, bind):
-    proceed, forced = _pop_toggle(u'auto_filter', attributes, context)
+@toggled_by(u'auto_filter')
+def transform_filters(tagname, attributes, contents, context, bind, forced):
     filters = context[u'filters']
-
-    if not proceed:
-        return contents
-
     for fn in filters:
         want = getattr(fn, 'tags', None)
         if want and tagname not in want:
@@ -309,6 +494,43 @@ def _unpack(html_string):
     return six.text_type(unpacked)
 
 
+#: Attributes output first, in this order, by _sorted_attributes().
+_static_attribute_order = [u'type', u'name', u'value']
+_attribute_rank = dict((name, rank)
+                       for rank, name in enumerate(_static_attribute_order))
+_attribute_entities = {ord(u'&'): u'&amp;', ord(u'<'): u'&lt;',
+                       ord(u'>'): u'&gt;', ord(u'"'): u'&quot;'}
+
+
+def _sorted_attributes(attributes):
+    """Return the items of *attributes* in markup output order.
+
+    The attributes of :data:`_static_attribute_order` lead, followed by the
+    rest in name order.
+
+    """
+    pairs = [(name, attributes[name])
+             for name in _static_attribute_order if name in attributes]
+    if len(pairs) != len(attributes):
+        rank = _attribute_rank
+        pairs.extend(sorted(item for item in six.iteritems(attributes)
+                            if item[0] not in rank))
+    return pairs
+
+
+def _attribute_escape(string):
+    if not string:
+        return u''
+    elif hasattr(string, '__html__'):
+        return _unpack(string)
+    elif (u'&' in string or u'<' in string or u'>' in string or
+          u'"' in string):
+        if string.__class__ is not six.text_type:
+            string = six.text_type(string)
+        return string.translate(_attribute_entities)
+    return string
+
+
 def _markup_escape(string):
     if not string:
         return u''
@@ -14,7 +14,12 @@ from genshi.template.directives import Directive
 from genshi.template.interpolation import interpolate
 
 
-from flatland.out.generic import _unpack, transform, Context
+from flatland.out.generic import (
+    Context,
+    _sorted_attributes,
+    _unpack,
+    transform,
+    )
 import six
 
 
@@ -22,8 +27,6 @@ __all__ = ('setup',)
 
 NS = Namespace(u'http://ns.discorporate.us/flatland/genshi')
 
-_static_attribute_order = [u'type', u'name', u'value']
-
 _to_context = {}
 for key in (u'auto-name', u'auto-value', u'auto-domid', u'auto-for',
             u'auto-tabindex', u'auto-filter', u'domid-format'):
@@ -293,8 +296,7 @@ def _rewrite_stream(stream, directives, ctxt, vars, bind):
     elif isinstance(new_contents, six.text_type):
         new_contents = [(TEXT, new_contents, (None, -1, -1))]
 
-    pairs = sorted(six.iteritems(mutable_attrs), key=_attribute_sort_key)
-    for attribute_name, value in pairs:
+    for attribute_name, value in _sorted_attributes(mutable_attrs):
         if attribute_name in existing_attributes:
             qname = existing_attributes.pop(attribute_name)
         else:
@@ -315,13 +317,6 @@ def _rewrite_stream(stream, directives, ctxt, vars, bind):
     return iter(stream)
 
 
-def _attribute_sort_key(item):
-    try:
-        return (0, _static_attribute_order.index(item[0]))
-    except ValueError:
-        return (1, item[0])
-
-
 def _bind_unbound_tags(stream, qname, bind):
     stream = deque(stream)
     while stream:
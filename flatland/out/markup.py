@@ -1,17 +1,30 @@
 from collections import defaultdict
-
-from flatland.out.generic import Context, transform, _unpack
+from contextlib import contextmanager
+
+from flatland.out.generic import (
+    Context,
+    _attribute_escape,
+    _markup_escape,
+    _pipeline,
+    _skeleton,
+    _sorted_attributes,
+    _toggle_keys,
+    _transform,
+    _unpack,
+    transform,
+    )
 from flatland.out.util import parse_trool
 import six
 
 
 _default_settings = {u'ordered_attributes': True}
-_static_attribute_order = [u'type', u'name', u'value']
 
 
 class Generator(Context):
     """General XML/HTML tag generator"""
 
+    _writer = None
+
     def __init__(self, markup='xhtml', **settings):
         """Create a generator.
 
@@ -32,7 +45,7 @@ class Generator(Context):
         else:
             raise TypeError("Unknown markup type %r" % markup)
         self._tags = defaultdict(list)
-        self._frames[-1].update(_default_settings)
+        self._define(_default_settings)
         self.push()
         self.update(settings)
 
@@ -182,6 +195,59 @@ class Generator(Context):
         """
         return self._tag(u'label')
 
+    @contextmanager
+    def render_to(self, writer):
+        """Send markup passed to :meth:`write` to *writer*.
+
+        :param writer: a callable accepting a unicode string, such as
+          ``list.append``, or an object with a ``write`` method, such as an
+          :class:`io.StringIO`.
+
+        Within the ``with`` block, :meth:`write` writes its argument to
+        *writer* instead of returning it.  Tags are generated as usual and
+        are written only when passed to :meth:`write`, so they may be
+        nested, combined or kept for later first.  Output may be passed on
+        in chunks as it accumulates, for example to stream a form from a
+        WSGI application::
+
+          def render_form(generator, form):
+              chunks = []
+              with generator.render_to(chunks.append):
+                  generator.write(generator.form.open(form))
+                  for field in form.values():
+                      generator.write(generator.label(field))
+                      generator.write(generator.input(field))
+                      if len(chunks) > 64:
+                          yield u''.join(chunks)
+                          del chunks[:]
+                  generator.write(generator.form.close())
+              yield u''.join(chunks)
+
+        """
+        write = getattr(writer, 'write', writer)
+        previous, self._writer = self._writer, write
+        try:
+            yield self
+        finally:
+            self._writer = previous
+
+    def write(self, string):
+        """Write *string* within :meth:`render_to`, escaping unless markup.
+
+        Strings with an ``__html__`` method, such as generated tags, are
+        written as-is.  Returns empty markup within :meth:`render_to`, and
+        the escaped string as markup outside of it.
+
+        """
+        if hasattr(string, '__html__'):
+            string = _unpack(string)
+        else:
+            string = _markup_escape(string)
+        if self._writer is not None:
+            self._writer(string)
+            string = u''
+        return self['markup_wrapper'](string)
+
     def tag(self, tagname, bind=None, **attributes):
         """Generate any tag.
 
@@ -257,27 +323,54 @@ class Tag(object):
     def _open(self, bind, kwargs):
         """Return a '<partial' opener tag with no terminator."""
         contents = kwargs.pop('contents', None)
+        context = self._context
         attributes = _unicode_keyed(kwargs)
         tagname = self.tagname
-        new_contents = transform(
-            tagname, attributes, contents, self._context, bind)
+        if attributes and not _toggle_keys.isdisjoint(attributes):
+            # toggles given on the tag itself are resolved transform by
+            # transform
+            pipeline = None
+        else:
+            pipeline = _pipeline(tagname, context)
+        skeleton = _skeleton(pipeline, tagname, attributes, context, bind)
+        if skeleton is None:
+            fragments = opening = None
+            if pipeline is None:
+                new_contents = transform(
+                    tagname, attributes, contents, context, bind)
+            else:
+                new_contents = _transform(pipeline, tagname, attributes,
+                                          contents, context, bind)
+        else:
+            static, fragments, dynamic, opening = skeleton
+            # with no dynamic transforms, the opener is already built
+            attributes = static if opening is not None else static.copy()
+            new_contents = contents
+            for fn, body in dynamic:
+                new_contents = body(tagname, attributes, new_contents,
+                                    context, bind, False)
 
         if not new_contents:
             new_contents = u''
         elif hasattr(new_contents, '__html__'):
             new_contents = _unpack(new_contents)
         self.contents = self._markup(new_contents)
+        if opening is not None:
+            return opening
 
-        if self._context['ordered_attributes']:
-            pairs = sorted(attributes.items(), key=_attribute_sort_key)
+        if context['ordered_attributes']:
+            pairs = _sorted_attributes(attributes)
         else:
             pairs = six.iteritems(attributes)
-        guts = u' '.join(u'%s="%s"' % (k, _attribute_escape(v))
-                         for k, v in pairs)
-        if guts:
-            return u'<' + tagname + u' ' + guts
-        else:
-            return u'<' + tagname
+        parts = [u'<', tagname]
+        for key, value in pairs:
+            if fragments is not None:
+                fragment = fragments.get(key)
+                if fragment is not None and fragment[0] is value:
+                    parts.append(fragment[1])
+                    continue
+            parts += (u' ', key, u'="', _attribute_escape(value), u'"')
+        return u''.join(parts)
 
     def _close(self):
         return u'</' + self.tagname + u'>'
@@ -303,29 +396,12 @@ class Tag(object):
         return self()
 
 
-def _attribute_escape(string):
-    if not string:
-        return u''
-    elif hasattr(string, '__html__'):
-        return _unpack(string)
-    else:
-        return string. \
-               replace(u'&', u'&amp;'). \
-               replace(u'<', u'&lt;'). \
-               replace(u'>', u'&gt;'). \
-               replace(u'"', u'&quot;')
-
-
 def _unicode_keyed(bytestring_keyed):
     rekeyed = {}
-    for key, value in bytestring_keyed.items():
-        as_unicode = six.text_type(key).rstrip('_')
-        rekeyed[as_unicode] = value
+    for key, value in six.iteritems(bytestring_keyed):
+        if key.__class__ is not six.text_type:
+            key = six.text_type(key)
+        if key[-1:] == u'_':
+            key = key.rstrip(u'_')
+        rekeyed[key] = value
     return rekeyed
-
-
-def _attribute_sort_key(item):
-    try:
-        return (0, _static_attribute_order.index(item[0]))
-    except ValueError:
-        return (1, item[0])
@@ -7,6 +7,7 @@ from .base import (
     Slot,
     Unevaluated,
     Unset,
+    ValidationResult,
     )
 from .scalars import (
     Boolean,
@@ -42,6 +43,9 @@ from .compound import (
 from .forms import (
     Form,
     )
+from .pool import (
+    ElementPool,
+    )
 from .properties import (
     Properties,
     )
@@ -0,0 +1,102 @@
+# -*- coding: utf-8; fill-column: 78 -*-
+"""Asynchronous validation under asyncio.
+
+Only imported on Python 3.5 and later, by
+:meth:`~flatland.schema.base.Element.validate_async` and by
+:func:`~flatland.schema.base.validate_element` when a validator returns an
+awaitable.
+
+"""
+import asyncio
+from inspect import isawaitable
+
+from .base import (
+    SkipAll,
+    SkipAllFalse,
+    Unevaluated,
+    _context,
+    _run_validators,
+    )
+
+
+__all__ = 'validate_async',
+
+
+async def finish_validation(element, state, valid, fn, validators):
+    """Finish a validate_element() interrupted by an awaitable *valid*.
+
+    *fn* is the validator that returned *valid*, and *validators* an
+    iterator of those remaining.
+
+    """
+    valid = await valid
+    previous, _context.asynchronous = _context.asynchronous, True
+    try:
+        outcome = _run_validators(element, state, validators, None, fn, valid)
+    finally:
+        _context.asynchronous = previous
+    if isawaitable(outcome):
+        outcome = await outcome
+    return outcome
+
+
+async def validate_level(elements, state, descending):
+    """Validate *elements* in one direction, concurrently.
+
+    Validators are called in the order of *elements*; the awaitables they
+    return are then awaited together.
+
+    """
+    results = []
+    previous, _context.asynchronous = _context.asynchronous, True
+    try:
+        for element in elements:
+            results.append(element._validate(state, descending))
+    finally:
+        _context.asynchronous = previous
+
+    waiting = [index for index, result in enumerate(results)
+               if isawaitable(result)]
+    if waiting:
+        done = await asyncio.gather(*[results[index] for index in waiting])
+        for index, result in zip(waiting, done):
+            results[index] = result
+    return results
+
+
+async def validate_async(element, state=None):
+    """Validate *element* as Element.validate_async() describes."""
+    valid = True
+    levels, level = [], [element]
+
+    # descend a level at a time, skipping any branches that return All*
+    while level:
+        levels.append(level)
+        below = []
+        results = await validate_level(level, state, True)
+        for element, validated in zip(level, results):
+            if validated is Unevaluated:
+                element.valid = validated
+            else:
+                element.valid = bool(validated)
+                if valid:
+                    valid &= validated
+            if validated is SkipAll or validated is SkipAllFalse:
+                continue
+            below.extend(element.children)
+        level = below
+
+    # back up, visiting only the elements that weren't skipped above
+    for level in reversed(levels):
+        level = level[::-1]
+        results = await validate_level(level, state, False)
+        for element, validated in zip(level, results):
+            # an Unevaluated ascent validator does not override the results
+            # of descent validation
+            if validated is Unevaluated:
+                pass
+            elif element.valid:
+                element.valid = bool(validated)
+                if valid:
+                    valid &= validated
+    return bool(valid)
@@ -1,21 +1,26 @@
 # -*- coding: utf-8; fill-column: 78 -*-
 import collections
+import inspect
 import itertools
 import operator
+import time
+from weakref import WeakKeyDictionary
 from flatland.schema.paths import pathexpr
 from flatland.schema.properties import Properties
 from flatland.signals import validator_validated
 from flatland.util import (
+    LRUCache,
     Unspecified,
     assignable_class_property,
     class_cloner,
     named_int_factory,
     symbol,
+    threading,
     )
 import six
 
 
-__all__ = 'Element'
+__all__ = 'Element', 'ValidationResult'
 
 NoneType = type(None)
 Root = symbol('Root')
@@ -60,6 +65,84 @@ class _BaseElement(object):
     pass
 
 
+def _flat_name_below(element, above, prefix, sep):
+    """Extend *prefix*, the flat name of *above*, down to *element*.
+
+    Returns None if no names have been joined yet.
+
+    """
+    names, node = [], element
+    while node is not above:
+        if node is None:
+            # not a descendant after all; take the long way around
+            names = [parent.name for parent in element.path
+                     if parent.name is not None]
+            return sep.join(names) if names else None
+        if node.name is not None:
+            names.append(node.name)
+        node = node.parent
+    for name in reversed(names):
+        prefix = name if prefix is None else prefix + sep + name
+    return prefix
+
+
+class _MessageList(object):
+    """An element's list of messages, created on first use.
+
+    Detached validations leave elements untouched: within one, a list not
+    yet created reads as an empty list that is not kept.
+
+    """
+
+    def __init__(self, name, doc):
+        self.name = name
+        self.__doc__ = doc
+
+    def __get__(self, element, cls):
+        if element is None:
+            return self
+        if _context.result is not None:
+            return []
+        messages = element.__dict__[self.name] = []
+        return messages
+
+
+def _compact_class(cls):
+    """Return a subclass of *cls* keeping per-element state in slots."""
+    slots, defaults = [], {}
+    for attribute in cls._compact_attributes:
+        if attribute in cls._compact_slots:
+            continue
+        for base in cls.__mro__:
+            if attribute in base.__dict__:
+                default = base.__dict__[attribute]
+                break
+        else:
+            default = Unspecified
+        if hasattr(default, '__get__'):
+            # computed by a property
+            continue
+        slots.append(attribute)
+        if default is not Unspecified:
+            defaults[attribute] = default
+
+    members = {'__doc__': cls.__doc__,
+               '__module__': cls.__module__,
+               '__slots__': tuple(slots)}
+    if slots:
+        members['_compact_slots'] = cls._compact_slots + tuple(slots)
+
+        def __getattr__(self, name):
+            # an unset slot reads as the class default it hides
+            try:
+                return defaults[name]
+            except KeyError:
+                raise AttributeError("%r object has no attribute %r" % (
+                    type(self).__name__, name))
+        members['__getattr__'] = __getattr__
+    return type(cls.__name__, (cls,), members)
+
+
 class Element(_BaseElement):
     """Base class for form fields.
 
@@ -102,6 +185,28 @@ class Element(_BaseElement):
     See `Message Internationalization`_.
     """
 
+    timeout_message = u'Validation did not complete in time.'
+    """The error noted for a blocking validator still running at the deadline.
+
+    See the *timeout* of :meth:`validate`.
+    """
+
+    adaptive_validation = False
+    """If True, reorder commutative validators by their observed costs.
+
+    Adjacent validators with a true ``commutative`` attribute may be run in
+    any order.  Their running time and failure rate are recorded for each
+    element class, and runs of them are periodically reordered so that the
+    validators likeliest to fail cheaply run first.  See
+    :func:`validate_element`.
+    """
+
+    truncated = False
+    """True if the last :meth:`validate` of this element stopped early.
+
+    See the *max_errors* and *deadline* of :meth:`validate`.
+    """
+
     value = None
     """The element's native Python value.
 
@@ -127,12 +232,30 @@ class Element(_BaseElement):
     validates_down = None
     validates_up = None
 
+    _parent = None
+    _path_cache = None
+    _path_dependents = None
+
+    #: Instance attributes kept in ``__slots__`` by :meth:`compacted`.
+    _compact_attributes = ('_parent', 'valid', 'raw', 'value', 'u')
+    #: The slotted attributes of a compacted class.
+    _compact_slots = ()
+
+    #: If False, descent validation without validators is Unevaluated rather
+    #: than the default ``not is_empty`` check.
+    _default_descent_validation = True
+    _validation_plan = None
+
+    # recorded by incremental validation
+    _snapshot = None
+    _descended = None
+    _descended_messages = None
+
     def __init__(self, value=Unspecified, **kw):
-        self.parent = kw.pop('parent', None)
+        # nothing is cached yet, so skip the parent property
+        self._parent = kw.pop('parent', None)
 
         self.valid = Unevaluated
-        self.errors = []
-        self.warnings = []
 
         # FIXME This (and 'using') should also do descent_validators
         # via lookup - or don't copy at all
@@ -195,6 +318,31 @@ class Element(_BaseElement):
                     attribute, cls.__name__))
         return cls
 
+    @classmethod
+    def compacted(cls):
+        """Return a class whose elements keep their state in ``__slots__``.
+
+        :returns: a new class
+
+        The attributes every element sets while loading and validating,
+        :attr:`value`, :attr:`u`, :attr:`raw`, :attr:`valid` and the parent,
+        are stored in slots.  An instance dictionary is only created if
+        something else is assigned to the element, such as messages,
+        instance :attr:`properties` or constructor overrides, or by
+        :meth:`reset`.  Compacted classes otherwise behave as *cls*, and may
+        be further configured with :meth:`named`, :meth:`using` and the
+        like.
+
+        Containers compact their member schema as well, so compacting a
+        :class:`~flatland.Form` compacts the whole tree.
+
+        This saves memory on interpreters that give each instance its own
+        dictionary.  From Python 3.11, instances store their attributes
+        without one, and compacting does not make elements smaller.
+
+        """
+        return _compact_class(cls)
+
     @class_cloner
     def validated_by(cls, *validators):
         """Return a class with validators set to *\*validators*.
@@ -338,11 +486,45 @@ class Element(_BaseElement):
           element = cls(**kw)
           element.set_default()
 
+        Without *\*\*kw*, the element is copied from a defaulted prototype
+        cached on *cls*.  Schemas using a :attr:`default_factory` or
+        customized construction are always built afresh.
+
         """
+        if not kw:
+            prototype = _prototype(cls)
+            if prototype is not None:
+                return prototype._clone(None)
         element = cls(**kw)
         element.set_default()
         return element
 
+    def _clone(self, parent):
+        """Return a copy of this prototype element and its children.
+
+        Prototypes are elements built by the library's own constructors and,
+        optionally, :meth:`set_default`, and are never handed out.  Only the
+        state those leave behind is copied; values are shared.
+
+        """
+        cls = type(self)
+        clone = cls.__new__(cls)
+        state = self.__dict__
+        if state:
+            clone.__dict__.update(state)
+        for attribute in cls._compact_slots:
+            try:
+                value = object.__getattribute__(self, attribute)
+            except AttributeError:
+                continue
+            object.__setattr__(clone, attribute, value)
+        clone._parent = parent
+        self._clone_children(clone)
+        return clone
+
+    def _clone_children(self, clone):
+        """Populate *clone* with copies of this prototype's children."""
+
     def __eq__(self, other):
         try:
             return self.value == other.value and self.u == other.u
@@ -377,13 +559,70 @@ class Element(_BaseElement):
     all_valid = property(_get_all_valid, _set_all_valid)
     del _get_all_valid, _set_all_valid
 
+    def _get_parent(self):
+        return self._parent
+
+    def _set_parent(self, parent):
+        self._parent = parent
+        if self._path_cache is not None:
+            self._forget_path()
+    parent = property(_get_parent, _set_parent, doc="""\
+        The element containing this element, or None.
+
+        Assigning a new parent discards the cached :attr:`root`,
+        :meth:`fq_name` and :meth:`flattened_name` of the element and its
+        children.
+        """)
+    del _get_parent, _set_parent
+
+    def _cached_path(self, key, compute):
+        """Return the path-derived value *key* of a child, computing it once."""
+        cache = self._path_cache
+        if cache is not None and key in cache:
+            return cache[key]
+        if _context.result is not None:
+            # detached validations leave the tree untouched
+            return compute()
+        if cache is None:
+            cache = self._path_cache = {}
+            # each ancestor, roots included, notes the element depending on
+            # it, to forget the chain of caches below it when it moves
+            node = self
+            while node._parent is not None:
+                parent = node._parent
+                dependents = parent._path_dependents
+                if dependents is None:
+                    dependents = parent._path_dependents = {}
+                dependents[id(node)] = node
+                if parent._path_cache is not None:
+                    break
+                parent._path_cache = {}
+                node = parent
+        value = cache[key] = compute()
+        return value
+
+    def _forget_path(self):
+        """Discard cached path values of this element and those below it.
+
+        Follows the elements that cached values through this one, whether
+        or not they are among its :attr:`children`.
+
+        """
+        self._path_cache = None
+        dependents = self._path_dependents
+        if dependents:
+            self._path_dependents = None
+            for node in six.itervalues(dependents):
+                if node._parent is self and node._path_cache is not None:
+                    node._forget_path()
+
     @property
     def root(self):
         """The top-most parent of the element."""
-        try:
-            return list(self.parents)[-1]
-        except IndexError:
+        parent = self._parent
+        if parent is None:
             return self
+        return self._cached_path('root', lambda: parent.root)
 
     @property
     def parents(self):
@@ -454,29 +693,34 @@ class Element(_BaseElement):
           u'.0'
 
         """
-        if self.parent is None:
+        if self._parent is None:
             return sep
-
-        children_of_root = reversed(list(self.parents)[:-1])
-
-        parts, mask = [], None
-        for element in list(children_of_root) + [self]:
-            # allow Slot elements to mask the names of their child
-            # e.g.
-            #     <List name='l'> <Slot name='0'> <String name='s'>
-            # has an .el()/Python path of just
-            #   l.0
-            # not
-            #   l.0.s
-            if isinstance(element, Slot):
-                mask = element.name
-                continue
-            elif mask:
-                parts.append(mask)
-                mask = None
-                continue
-            parts.append(element.name)
-        return sep + sep.join(parts)
+        return self._cached_path(
+            ('fq_name', sep), lambda: sep + sep.join(self._fq_parts()))
+
+    def _fq_parts(self):
+        """The :meth:`fq_name` path components of the element, a tuple."""
+        parent = self._parent
+        if parent is None:
+            return ()
+        return self._cached_path('fq_parts', lambda: self._fq_parts_below(
+            parent))
+
+    def _fq_parts_below(self, parent):
+        parts = parent._fq_parts()
+        # allow Slot elements to mask the names of their child
+        # e.g.
+        #     <List name='l'> <Slot name='0'> <String name='s'>
+        # has an .el()/Python path of just
+        #   l.0
+        # not
+        #   l.0.s
+        if isinstance(self, Slot):
+            return parts
+        elif (isinstance(parent, Slot) and parent._parent is not None and
+              parent.name):
+            return parts + (parent.name,)
+        return parts + (self.name,)
 
     def find(self, path, single=False, strict=True):
         """Find child elements by string path.
@@ -614,14 +858,53 @@ class Element(_BaseElement):
             assert False
             return None
 
+    errors = _MessageList('errors', """\
+        A list of validation error messages, created on first use.""")
+
+    warnings = _MessageList('warnings', """\
+        A list of validation warning messages, created on first use.""")
+
+    def reset(self):
+        """Return the element to the state of a newly constructed element.
+
+        Clears the value, :attr:`raw`, :attr:`valid` state, messages and
+        instance :attr:`properties` of the element and its children in place.
+        Sequences are emptied.  Configuration given to the constructor, such
+        as an instance :attr:`name`, is kept.
+
+        """
+        state = self.__dict__
+        for attribute in _value_attributes:
+            state.pop(attribute, None)
+        self.valid = Unevaluated
+        for bucket in ('errors', 'warnings'):
+            messages = state.get(bucket)
+            if messages:
+                del messages[:]
+        for attribute in ('properties', 'truncated', '_snapshot',
+                          '_descended', '_descended_messages'):
+            state.pop(attribute, None)
+        if self._compact_slots:
+            _reset_slots(self)
+        self._reset_children()
+
+    def _reset_children(self):
+        """Return children to their newly constructed state."""
+
     def add_error(self, message):
         "Register an error message on this element, ignoring duplicates."
-        if message not in self.errors:
+        result = _context.result
+        if result is not None:
+            result.add_error(self, message)
+        elif message not in self.errors:
             self.errors.append(message)
 
     def add_warning(self, message):
         "Register a warning message on this element, ignoring duplicates."
-        if message not in self.warnings:
+        result = _context.result
+        if result is not None:
+            result.add_warning(self, message)
+        elif message not in self.warnings:
             self.warnings.append(message)
 
     def flattened_name(self, sep=u'_'):
@@ -644,9 +927,17 @@ class Element(_BaseElement):
           u'addresses_0_address'
 
         """
-        return sep.join(parent.name
-                        for parent in self.path
-                        if parent.name is not None)
+        prefix = self._flat_prefix(sep)
+        return u'' if prefix is None else prefix
+
+    def _flat_prefix(self, sep):
+        """The flattened name, or None if no element on the path is named."""
+        parent = self._parent
+        if parent is None:
+            return self.name
+        return self._cached_path(
+            ('flat', sep), lambda: _flat_name_below(
+                self, parent, parent._flat_prefix(sep), sep))
 
     def flatten(self, sep=u'_', value=operator.attrgetter('u')):
         """Export an element hierarchy as a flat sequence of key, value pairs.
@@ -688,15 +979,37 @@ class Element(_BaseElement):
           [(u'contact_name', u'')]
 
         """
+        return list(self.iter_flatten(sep, value))
+
+    def iter_flatten(self, sep=u'_', value=operator.attrgetter('u')):
+        """Iterate over the element hierarchy as flat key, value pairs.
+
+        A generator yielding the pairs of :meth:`flatten` in the same order.
+        The tree is walked once, breadth-first, with each element's flattened
+        name built from its parent's rather than from the root down.
+
+        """
+        names = [parent.name for parent in self.path
+                 if parent.name is not None]
+        prefix = sep.join(names) if names else None
         if self.flattenable:
-            pairs = [(self.flattened_name(sep), value(self))]
-        else:
-            pairs = []
-        if self.children_flattenable:
-            pairs.extend((e.flattened_name(sep), value(e))
-                         for e in self.all_children
-                         if e.flattenable)
-        return pairs
+            yield (prefix if prefix is not None else u''), value(self)
+        if not self.children_flattenable:
+            return
+
+        seen = set((id(self),))
+        queue = collections.deque((child, self, prefix)
+                                  for child in self.children)
+        while queue:
+            element, above, prefix = queue.popleft()
+            if id(element) in seen:
+                continue
+            seen.add(id(element))
+            name = _flat_name_below(element, above, prefix, sep)
+            if element.flattenable:
+                yield (name if name is not None else u''), value(element)
+            queue.extend((child, element, name)
+                         for child in element.children)
 
     def set(self, value):
         """Assign the native and Unicode value.
@@ -756,6 +1069,22 @@ class Element(_BaseElement):
     def _set_flat(self, pairs, sep):
         raise NotImplementedError()
 
+    def flat_loader(self, sep=u'_'):
+        """Return a loader that sets element values from pairs incrementally.
+
+        Pairs fed to the :class:`~flatland.schema.routing.FlatLoader` are
+        routed into the element tree one at a time, without first being
+        collected.  Once closed, the result is as if all pairs had been given
+        to :meth:`set_flat`::
+
+          with form.flat_loader() as loader:
+              for key, value in pairs:
+                  loader.feed(key, value)
+
+        """
+        from .routing import FlatLoader
+        return FlatLoader(self, sep)
+
     def set_default(self):
         """set() the element to the schema default."""
         raise NotImplementedError()
@@ -765,7 +1094,9 @@ class Element(_BaseElement):
         """True if the element has no value."""
         return True if (self.value is None and self.u == u'') else False
 
-    def validate(self, state=None, recurse=True):
+    def validate(self, state=None, recurse=True, incremental=False,
+                 detached=False, executor=None, timeout=None,
+                 max_errors=None, deadline=None):
         """Assess the validity of this element and its children.
 
         :param state: optional, will be passed unchanged to all validator
@@ -774,6 +1105,24 @@ class Element(_BaseElement):
         :param recurse: if False, do not validate children.  :returns: True or
           False
 
+        :param incremental: if True, only revalidate elements changed since
+          the last incremental validation.  See below.
+
+        :param detached: if True, leave the elements untouched and return a
+          :class:`ValidationResult` instead.  See below.
+
+        :param executor: optional, a :class:`concurrent.futures.Executor` to
+          run blocking validators on.  See below.
+
+        :param timeout: optional, with *executor*, the number of seconds
+          blocking validators may take overall.
+
+        :param max_errors: optional, stop validating once this many elements
+          have failed.  See below.
+
+        :param deadline: optional, stop validating once this many seconds
+          have passed.
+
         Iterates through this element and all of its children, invoking each
         element's :meth:`schema.validate_element`.  Each element will be
         visited twice: once heading down the tree, breadth-first, and again
@@ -781,62 +1130,372 @@ class Element(_BaseElement):
 
         Returns True if all validations pass, False if one or more fail.
 
+        An incremental validation records the state of each element it
+        visits.  The next incremental validation runs descent validators only
+        on elements whose :attr:`raw`, :attr:`u` or :attr:`value`, or whose
+        set of children, changed since, as through :meth:`set`,
+        :meth:`set_flat` or list mutation.  Ascent validators run on those
+        elements and their ancestors.  All other elements keep their earlier
+        :attr:`valid` state and messages.  Elements whose descent validators
+        skip their children are always revalidated.  Incremental validation
+        assumes validators depend only on the element they validate and,
+        ascending, its descendants, and that *state* is unchanged.
+
+        Batch validators, those with a ``validate_batch`` method, are called
+        once per tree level with every element they validate in that level.
+        See :func:`validate_element`.
+
+        Validators with a true ``blocking`` attribute, such as those making
+        network requests, may be run on an *executor*.  Descending, the
+        blocking validators of each tree level are submitted together and
+        their results gathered before the next level is visited.  Messages
+        they note are added to the elements in tree order, as if run in
+        place.  Blocking validators still running *timeout* seconds after
+        validation started fail, noting the element's
+        :attr:`timeout_message`.  Outside of the descent of a recursive
+        validation, blocking validators run in place.
+
+        A detached validation records :attr:`valid` states and the messages
+        of :meth:`add_error` and :meth:`add_warning` in a
+        :class:`ValidationResult`, leaving those of the elements as they
+        were.  A single tree may be validated in detached mode from many
+        threads at once, provided no validator modifies the elements and
+        nothing else modifies the tree meanwhile.  The one exception is the
+        deferred fields of :attr:`~flatland.Dict.lazy_fields` mappings,
+        which a detached validation creates before any validator runs.
+        Validators that read the :attr:`valid` state or messages of elements
+        see those of the tree, not the result.
+
+        A validation given *max_errors* or a *deadline* stops descending once
+        that many elements have failed their descent validation, or the
+        deadline has passed, and runs no ascent validators.  Validators
+        already running are not interrupted.  The elements not yet visited
+        are left :attr:`valid` :obj:`Unevaluated`, and the element validated
+        is marked :attr:`truncated` and invalid.  Such a validation returns
+        False, even if no element failed.
+
         """
+        if _context.asynchronous:
+            # called by a validator within validate_async()
+            _context.asynchronous = False
+            try:
+                return self.validate(state, recurse, incremental, detached,
+                                     executor, timeout, max_errors, deadline)
+            finally:
+                _context.asynchronous = True
+        bounded = max_errors is not None or deadline is not None
+        if detached:
+            if incremental:
+                raise TypeError(
+                    "incremental validation can not be detached")
+            if bounded:
+                raise TypeError(
+                    "max_errors and deadline apply to attached validation")
+            return self._validate_detached(state, recurse, executor, timeout)
+        if incremental and recurse:
+            if bounded:
+                raise TypeError(
+                    "max_errors and deadline can not be incremental")
+            return self._validate_incremental(state, executor, timeout)
+        return self._validate_tree(state, recurse, executor, timeout,
+                                   max_errors, deadline, None)
+
+    def _validate_tree(self, state, recurse, executor, timeout, max_errors,
+                       deadline, result):
+        """Run :meth:`validate`, recording states in *result* if given."""
+        if result is None:
+            validity = None
+        else:
+            validity = result._valid
+            visited = result._elements
+            visited[id(self)] = self
         if not recurse:
             down = self._validate(state, True)
-            if down is Unevaluated:
+            down = down if down is Unevaluated else bool(down)
+            if validity is None:
                 self.valid = down
             else:
-                self.valid = bool(down)
+                validity[id(self)] = down
 
             up = self._validate(state, False)
             # an Unevaluated ascent validator does not override the results
             # of descent validation
-            if up is not Unevaluated:
+            if up is Unevaluated:
+                return down
+            elif validity is None:
                 self.valid = bool(up)
-            return self.valid
-
-        valid = True
-        elements, seen, queue = [], set(), collections.deque([self])
-
-        # descend breadth first, skipping any branches that return All*
-        while queue:
-            element = queue.popleft()
-            if id(element) in seen:
-                continue
-            seen.add(id(element))
-            elements.append(element)
-            validated = element._validate(state, True)
-
-            if validated is Unevaluated:
-                element.valid = validated
             else:
-                element.valid = bool(validated)
-                if valid:
-                    valid &= validated
-            if validated is SkipAll or validated is SkipAllFalse:
-                continue
-            queue.extend(element.children)
+                validity[id(self)] = bool(up)
+            return bool(up)
+
+        bounded = max_errors is not None or deadline is not None
+        valid, truncated, failures = True, False, 0
+        if max_errors is None:
+            max_errors = -1
+        if deadline is not None:
+            deadline += _clock()
+        elements, index, level_end, deferred = [self], 0, 1, None
+        batches = _Batches(executor, timeout)
+        previous, _context.batches = _context.batches, batches
+        try:
+            # descend breadth first, skipping any branches that return All*
+            while index < len(elements):
+                if bounded and (failures == max_errors or (
+                        deadline is not None and _clock() >= deadline)):
+                    truncated = True
+                    break
+                element = elements[index]
+                index += 1
+                if validity is not None:
+                    visited[id(element)] = element
+                cls = type(element)
+                plan = cls._validation_plan
+                if plan is None or plan[0] is not cls:
+                    plan = _validation_plan(cls)
+                attribute = element.validates_down
+                if not plan[1]:
+                    _context.batches = None
+                    validated = element._validate(state, True)
+                    _context.batches = batches
+                elif not attribute:
+                    validated = Unevaluated
+                else:
+                    validators = getattr(element, attribute, None)
+                    if not validators and not plan[2]:
+                        validated = Unevaluated
+                    else:
+                        validated = validate_element(
+                            element, state, validators)
+
+                if deferred is not None or validated.__class__ is _Deferred:
+                    # batched validators finish at the end of the level
+                    if deferred is None:
+                        deferred = []
+                    deferred.append((element, validated))
+                else:
+                    if validated is Unevaluated:
+                        down = validated
+                    else:
+                        down = bool(validated)
+                        if valid:
+                            valid &= validated
+                        if not down:
+                            failures += 1
+                    if validity is None:
+                        element.valid = down
+                    else:
+                        validity[id(element)] = down
+                    if not (plan[3] or validated is SkipAll or
+                            validated is SkipAllFalse):
+                        elements.extend(element.children)
+
+                if index == level_end:
+                    if deferred is not None:
+                        batches.flush()
+                        for element, validated in deferred:
+                            valid = _descended(element, validated, valid,
+                                               elements, validity)
+                            if validity is None:
+                                down = element.valid
+                            else:
+                                down = validity[id(element)]
+                            if down is False:
+                                failures += 1
+                        deferred = None
+                    level_end = len(elements)
+            if deferred is not None:
+                # truncated mid-level; finish the validators started
+                batches.flush()
+                for element, validated in deferred:
+                    valid = _descended(
+                        element, validated, valid, elements, validity)
+        finally:
+            _context.batches = previous
+
+        if truncated:
+            for element in elements[index:]:
+                element.valid = Unevaluated
+                for child in element.all_children:
+                    child.valid = Unevaluated
+            self.valid = False
+            self.truncated = True
+            return False
+        if result is None and self.truncated:
+            self.truncated = False
 
         # back up, visiting only the elements that weren't skipped above
         for element in reversed(elements):
-            validated = element._validate(state, False)
+            if element._validation_plan[1]:
+                attribute = element.validates_up
+                if not attribute:
+                    continue
+                validated = validate_element(
+                    element, state, getattr(element, attribute, None))
+            else:
+                validated = element._validate(state, False)
 
             # an Unevaluated ascent validator does not override the results
             # of descent validation
+            if validated is Unevaluated:
+                pass
+            elif validity is None:
+                if element.valid:
+                    element.valid = bool(validated)
+                    if valid:
+                        valid &= validated
+            elif validity[id(element)]:
+                validity[id(element)] = bool(validated)
+                if valid:
+                    valid &= validated
+        return bool(valid)
+
+    def _validate_incremental(self, state, executor, timeout):
+        """Run an incremental :meth:`validate`."""
+        valid = True
+        elements, parents, changed = [self], [None], []
+        index, level_end, deferred = 0, 1, None
+        batches = _Batches(executor, timeout)
+        outer, _context.batches = _context.batches, batches
+        try:
+            while index < len(elements):
+                element = elements[index]
+                index += 1
+                cls = type(element)
+                plan = cls._validation_plan
+                if plan is None or plan[0] is not cls:
+                    plan = _validation_plan(cls)
+                if plan[3]:
+                    children = ()
+                    snapshot = (element.raw, element.u, element.value)
+                else:
+                    children = tuple(element.children)
+                    snapshot = (element.raw, children)
+
+                # skipped children aren't tracked, so elements skipping their
+                # children are always revalidated
+                previous, descended = element._snapshot, element._descended
+                if (previous is not None and
+                    descended is not SkipAll and
+                    descended is not SkipAllFalse and
+                    _same_snapshot(previous, snapshot)):
+                    changed.append(False)
+                    validated = descended
+                else:
+                    changed.append(True)
+                    _trim_messages(element, (0, 0))
+                    if plan[1]:
+                        validated = element._validate(state, True)
+                    else:
+                        _context.batches = None
+                        validated = element._validate(state, True)
+                        _context.batches = batches
+                    element._snapshot = snapshot
+
+                if deferred is not None or validated.__class__ is _Deferred:
+                    # batched validators finish at the end of the level
+                    if deferred is None:
+                        deferred = []
+                    deferred.append((index - 1, validated, children))
+                else:
+                    if changed[-1]:
+                        valid = _descended_incrementally(
+                            element, validated, valid)
+                    if not (validated is SkipAll or
+                            validated is SkipAllFalse):
+                        elements.extend(children)
+                        parents.extend([index - 1] * len(children))
+
+                if index == level_end:
+                    if deferred is not None:
+                        batches.flush()
+                        for position, validated, children in deferred:
+                            if changed[position]:
+                                valid = _descended_incrementally(
+                                    elements[position], validated, valid)
+                            while validated.__class__ is _Deferred:
+                                validated = validated.result
+                            if not (validated is SkipAll or
+                                    validated is SkipAllFalse):
+                                elements.extend(children)
+                                parents.extend([position] * len(children))
+                        deferred = None
+                    level_end = len(elements)
+        finally:
+            _context.batches = outer
+
+        # back up, revisiting changed elements and their parents
+        for index in reversed(range(len(elements))):
+            if not changed[index]:
+                if elements[index].valid is False:
+                    valid = False
+                continue
+            parent = parents[index]
+            if parent is not None and not changed[parent]:
+                changed[parent] = True
+                # ascent reruns on the result of the earlier descent
+                element = elements[parent]
+                _trim_messages(element, element._descended_messages)
+                descended = element._descended
+                if descended is Unevaluated:
+                    element.valid = descended
+                else:
+                    element.valid = bool(descended)
+
+            element = elements[index]
+            validated = element._validate(state, False)
             if validated is Unevaluated:
                 pass
             elif element.valid:
                 element.valid = bool(validated)
                 if valid:
                     valid &= validated
+            if element.valid is False:
+                valid = False
         return bool(valid)
 
+    def validate_async(self, state=None):
+        """Assess validity, awaiting asynchronous validators.
+
+        :param state: optional, will be passed unchanged to all validator
+            callables.
+
+        :returns: a coroutine resolving to True or False.
+
+        Validates as :meth:`validate` does, for use under :mod:`asyncio`::
+
+          valid = await form.validate_async(state)
+
+        Validators may return awaitables, such as the result of calling a
+        coroutine function.  Elements are validated a tree level at a time:
+        descending, each level's validators run once its parents' have
+        finished, and ascending once its children's have.  The awaitable
+        validators of elements in the same level run concurrently, while
+        those of a single element run in order.  Requires Python 3.5 or
+        later.
+
+        """
+        from flatland.schema.asyncsupport import validate_async
+        return validate_async(self, state)
+
+    def _validate_detached(self, state, recurse, executor, timeout):
+        """Run a :meth:`validate` recording results in a ValidationResult."""
+        _create_deferred(self)
+        result = ValidationResult(self)
+        previous, _context.result = _context.result, result
+        try:
+            result.valid = self._validate_tree(
+                state, recurse, executor, timeout, None, None, result)
+        finally:
+            _context.result = previous
+        return result
+
     def _validate(self, state, descending):
         """Run validation, transforming None into success. Internal."""
         if descending:
             if self.validates_down:
                 validators = getattr(self, self.validates_down, None)
+                if not validators and not self._default_descent_validation:
+                    return Unevaluated
                 return validate_element(self, state, validators)
         else:
             if self.validates_up:
@@ -887,6 +1546,564 @@ class Slot(object):
     """Marks a semi-visible Element-holding Element, like the 0 in list[0]."""
 
 
+class ValidationResult(object):
+    """The outcome of a detached :meth:`Element.validate`.
+
+    Holds the :attr:`~Element.valid` state and messages of each element
+    visited, in place of the elements themselves.  The result is true if
+    validation passed::
+
+      result = form.validate(state, detached=True)
+      if not result:
+          for message in result.errors(form['email']):
+              ...
+
+    """
+
+    def __init__(self, element):
+        #: The element validated.
+        self.element = element
+        #: The overall outcome of validation.
+        self.valid = Unevaluated
+        self._valid = {}
+        self._errors = {}
+        self._warnings = {}
+        # keeps recorded elements, and so their ids, alive
+        self._elements = {}
+
+    def __bool__(self):
+        return bool(self.valid)
+    __nonzero__ = __bool__
+
+    def is_valid(self, element):
+        """The validity of *element*, or Unevaluated if it was not visited."""
+        return self._valid.get(id(element), Unevaluated)
+
+    def errors(self, element):
+        """A list of the error messages recorded for *element*."""
+        return list(self._errors.get(id(element), ()))
+
+    def warnings(self, element):
+        """A list of the warning messages recorded for *element*."""
+        return list(self._warnings.get(id(element), ()))
+
+    def add_error(self, element, message):
+        """Record an error message for *element*, ignoring duplicates."""
+        self._add(self._errors, element, message)
+
+    def add_warning(self, element, message):
+        """Record a warning message for *element*, ignoring duplicates."""
+        self._add(self._warnings, element, message)
+
+    def _add(self, bucket, element, message):
+        self._elements[id(element)] = element
+        messages = bucket.setdefault(id(element), [])
+        if message not in messages:
+            messages.append(message)
+
+    def apply(self):
+        """Copy the recorded states and messages onto the elements."""
+        for key, element in six.iteritems(self._elements):
+            if key in self._valid:
+                element.valid = self._valid[key]
+            for message in self._errors.get(key, ()):
+                element.add_error(message)
+            for message in self._warnings.get(key, ()):
+                element.add_warning(message)
+
+
+class _ValidationContext(threading.local):
+    #: The ValidationResult of a detached validation in this thread.
+    result = None
+    #: The _Batches collecting batched validator calls in this thread.
+    batches = None
+    #: True while validate_async() calls validators in this thread.
+    asynchronous = False
+    #: The event loop running awaitable validators outside validate_async().
+    loop = None
+
+
+_context = _ValidationContext()
+
+
+#: Instance attributes holding an element's value, cleared by reset().
+_value_attributes = ('value', 'u', 'raw')
+
+#: Lazily computed instance state never carried over from a prototype.
+_unshared = ('errors', 'warnings', 'properties')
+
+#: Element construction hooks that must be the library's own for an element
+#: to be copied from a prototype instead of constructed.
+_construction_hooks = ('__init__', '_reset', 'set_default', 'default_value',
+                       'set', 'adapt', 'serialize')
+_library_hooks = None
+
+#: Held while creating the deferred children of a detached validation.
+_creating = threading.Lock()
+
+
+def _own_hooks():
+    """Return the construction hooks implemented by flatland's own classes."""
+    global _library_hooks
+    if _library_hooks is None:
+        from flatland.schema import compound, containers, forms, scalars
+        hooks = set()
+        for module in (compound, containers, forms, scalars):
+            _collect_hooks(vars(module), module.__name__, hooks)
+        _collect_hooks(globals(), __name__, hooks)
+        _library_hooks = frozenset(hooks)
+    return _library_hooks
+
+
+def _collect_hooks(namespace, module_name, hooks):
+    """Add the hooks of classes defined in *module_name* to *hooks*."""
+    for value in list(namespace.values()):
+        if isinstance(value, type) and value.__module__ == module_name:
+            hooks.update(value.__dict__[name] for name in _construction_hooks
+                         if name in value.__dict__)
+
+
+def _clonable(cls):
+    """True if defaulted elements of *cls* may be copied from a prototype."""
+    if cls.default_factory is not None:
+        return False
+    own = _own_hooks()
+    for name in _construction_hooks:
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                if base is not object and base.__dict__[name] not in own:
+                    return False
+                break
+    return True
+
+
+def _stored_children(element):
+    """Children as stored, including Slots and unmaterialized storage."""
+    if isinstance(element, Slot):
+        return (element.element,)
+    elif isinstance(element, list):
+        return list.__iter__(element)
+    elif isinstance(element, dict):
+        return dict.values(element)
+    return ()
+
+
+def _create_deferred(element):
+    """Create the deferred children of lazy containers below *element*.
+
+    Detached validations may read a tree from many threads at once, and so
+    must not create children as they go.  The tree is walked under a lock,
+    so that only the first walk creates anything.
+
+    """
+    with _creating:
+        queue = [element]
+        while queue:
+            queue.extend(queue.pop().children)
+
+
+def _prototype(cls):
+    """Return the cached defaulted prototype of *cls*, or None.
+
+    Prototypes are built once per schema class, with
+    :meth:`Element.set_default` applied.  Every element in the prototype
+    must be :func:`_clonable`.
+
+    """
+    prototype = cls.__dict__.get('_default_prototype', Unspecified)
+    if prototype is not Unspecified:
+        return prototype
+
+    prototype = None
+    if _clonable(cls):
+        prototype = cls()
+        prototype.set_default()
+        queue = [prototype]
+        while queue:
+            element = queue.pop()
+            if not _clonable(type(element)):
+                prototype = None
+                break
+            if element.__dict__:
+                for attribute in _unshared:
+                    element.__dict__.pop(attribute, None)
+            if element._path_cache is not None:
+                element._path_cache = element._path_dependents = None
+            queue.extend(_stored_children(element))
+    setattr(cls, '_default_prototype', prototype)
+    return prototype
+
+
+def _validation_plan(cls):
+    """Return how :meth:`Element.validate` visits elements of *cls*.
+
+    The plan is a ``(cls, inline, default_descent, leaf)`` tuple, cached on
+    the class.  *inline* is True if the class uses the stock
+    :meth:`Element._validate`, which ``validate`` then runs in place, skipping
+    elements without validators for a pass.  *leaf* is True if elements of
+    the class never have children.
+
+    """
+    inline = (six.get_unbound_function(cls._validate) is
+              six.get_unbound_function(Element._validate))
+    leaf = cls.children is Element.children
+    plan = cls._validation_plan = (
+        cls, inline, bool(cls._default_descent_validation), leaf)
+    return plan
+
+
+def _reset_slots(element):
+    """Clear the slotted value of a compacted *element* for reset()."""
+    for attribute in _value_attributes:
+        if attribute in element._compact_slots:
+            try:
+                delattr(element, attribute)
+            except AttributeError:
+                pass
+
+
+def _message_counts(element):
+    """Return the numbers of errors and warnings *element* holds."""
+    state = element.__dict__
+    return len(state.get('errors') or ()), len(state.get('warnings') or ())
+
+
+def _trim_messages(element, counts):
+    """Drop the errors and warnings of *element* beyond *counts*."""
+    state = element.__dict__
+    for bucket, count in zip(('errors', 'warnings'), counts):
+        messages = state.get(bucket)
+        if messages and len(messages) > count:
+            del messages[count:]
+
+
+def _same_snapshot(previous, snapshot):
+    """True if an element is unchanged since *previous* was recorded."""
+    if previous[0] is not snapshot[0] and previous[0] != snapshot[0]:
+        return False
+    if len(previous) == 3:
+        return previous[1:] == snapshot[1:]
+    before, after = previous[1], snapshot[1]
+    if len(before) != len(after):
+        return False
+    for old, new in zip(before, after):
+        if old is not new:
+            return False
+    return True
+
+
+_isawaitable = getattr(inspect, 'isawaitable', lambda obj: False)
+
+#: Validator class -> True if it provides ``validate_batch``.
+_batching = {}
+
+
+class _Deferred(object):
+    """A validate_element() paused at a batch or blocking validator."""
+
+    __slots__ = 'element', 'state', 'fn', 'validators', 'future', 'result'
+
+    def __init__(self, element, state, fn, validators):
+        self.element = element
+        self.state = state
+        self.fn = fn
+        self.validators = validators
+        self.future = None
+        self.result = None
+
+
+class _Batches(object):
+    """Validator calls deferred during a :meth:`Element.validate`."""
+
+    def __init__(self, executor=None, timeout=None):
+        self.pending = []
+        self.running = []
+        self._groups = {}
+        self.executor = executor
+        if timeout is None:
+            self.deadline = None
+        else:
+            self.deadline = _clock() + timeout
+
+    def defer(self, element, state, fn, validators):
+        """Queue *element* for *fn*'s next batch."""
+        deferred = _Deferred(element, state, fn, validators)
+        group = self._groups.get(id(fn))
+        if group is None:
+            group = self._groups[id(fn)] = []
+            self.pending.append((fn, group))
+        group.append(deferred)
+        return deferred
+
+    def submit(self, element, state, fn, validators):
+        """Start blocking validator *fn* for *element* on the executor."""
+        deferred = _Deferred(element, state, fn, validators)
+        if self.deadline is None or _clock() < self.deadline:
+            deferred.future = self.executor.submit(
+                _run_blocking, fn, element, state)
+        self.running.append(deferred)
+        return deferred
+
+    def flush(self):
+        """Run queued calls until every deferred validation finishes."""
+        while self.pending or self.running:
+            pending, self.pending, self._groups = self.pending, [], {}
+            for fn, group in pending:
+                results = _batch_results(
+                    fn, [deferred.element for deferred in group],
+                    group[0].state)
+                for deferred, valid in zip(group, results):
+                    deferred.result = _run_validators(
+                        deferred.element, deferred.state,
+                        deferred.validators, None, deferred.fn, valid)
+            if self.running:
+                self._gather()
+
+    def _gather(self):
+        """Wait for running blocking validators and continue validation."""
+        from concurrent.futures import wait
+
+        running, self.running = self.running, []
+        futures = [deferred.future for deferred in running
+                   if deferred.future is not None]
+        if self.deadline is None:
+            wait(futures)
+        else:
+            wait(futures, max(0, self.deadline - _clock()))
+
+        for deferred in running:
+            element, future = deferred.element, deferred.future
+            if future is None or not future.done():
+                if future is not None:
+                    future.cancel()
+                element.add_error(element.timeout_message)
+                valid = False
+            else:
+                valid, messages = future.result()
+                for note, message in messages:
+                    note(message)
+            deferred.result = _run_validators(
+                element, deferred.state, deferred.validators, None,
+                deferred.fn, valid)
+
+
+class _MessageRecorder(object):
+    """Records messages noted in a worker thread, for replay in order."""
+
+    def __init__(self):
+        self.messages = []
+
+    def add_error(self, element, message):
+        self.messages.append((element.add_error, message))
+
+    def add_warning(self, element, message):
+        self.messages.append((element.add_warning, message))
+
+
+def _run_blocking(fn, element, state):
+    """Call a blocking validator in a worker thread."""
+    recorder = _MessageRecorder()
+    _context.result = recorder
+    try:
+        return fn(element, state), recorder.messages
+    finally:
+        _context.result = None
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+#: Observed validator chains, by element class and validators.
+_chains = WeakKeyDictionary()
+_chains_lock = threading.Lock()
+
+#: The number of validator sequences observed per adaptive element class;
+#: the least recently used are forgotten.
+chains_per_class = 16
+
+#: The number of observed calls between reorderings of a validator chain.
+reorder_interval = 64
+
+
+class _Chain(object):
+    """Observed costs of an adaptive element class's validator sequence."""
+
+    __slots__ = ('members', 'ordered', 'positions', 'calls', 'failures',
+                 'seconds', 'pending', 'lock')
+
+    def __init__(self, members):
+        self.members = members
+        self.ordered = members
+        # positions of the commutative members, the only ones measured
+        self.positions = dict(
+            (id(fn), index) for index, fn in enumerate(members)
+            if getattr(fn, 'commutative', False) and not _is_batched(fn) and
+            not getattr(fn, 'blocking', False))
+        self.calls = [0] * len(members)
+        self.failures = [0] * len(members)
+        self.seconds = [0.0] * len(members)
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def record(self, fn, seconds, valid):
+        """Note a call of *fn* taking *seconds* and returning *valid*."""
+        if valid is not True and _isawaitable(valid):
+            return
+        index = self.positions[id(fn)]
+        with self.lock:
+            self.calls[index] += 1
+            self.seconds[index] += seconds
+            if not valid:
+                self.failures[index] += 1
+            self.pending += 1
+            if self.pending >= reorder_interval:
+                self.pending = 0
+                self.reorder()
+
+    def reorder(self):
+        """Sort each run of commutative members by cost per failure.
+
+        Called by :meth:`record` with :attr:`lock` held.
+
+        """
+        def cost(index):
+            calls = self.calls[index]
+            if not calls:
+                # unobserved validators go first, to be measured
+                return 0.0
+            return (self.seconds[index] / calls /
+                    ((self.failures[index] + 1.0) / (calls + 2.0)))
+
+        ordered, run = [], []
+        for index, fn in enumerate(self.members):
+            if id(fn) in self.positions:
+                run.append(index)
+                continue
+            ordered.extend(sorted(run, key=cost))
+            ordered.append(index)
+            run = []
+        ordered.extend(sorted(run, key=cost))
+        self.ordered = tuple(self.members[index] for index in ordered)
+
+
+def _chain(cls, validators):
+    """Return the :class:`_Chain` recording *validators* of *cls*, or None.
+
+    Sequences of unhashable validators are not recorded.
+
+    """
+    chains = _chains.get(cls)
+    if chains is None:
+        with _chains_lock:
+            chains = _chains.get(cls)
+            if chains is None:
+                chains = _chains[cls] = LRUCache(maxsize=chains_per_class)
+    members = tuple(validators)
+    try:
+        chain = chains.get(members)
+    except TypeError:
+        return None
+    if chain is None:
+        chain = _Chain(members)
+        chains.put(members, chain)
+    return chain
+
+
+def _is_batched(fn):
+    """True if validator *fn* provides ``validate_batch``."""
+    cls = fn.__class__
+    try:
+        return _batching[cls]
+    except KeyError:
+        batched = _batching[cls] = hasattr(cls, 'validate_batch')
+        return batched
+
+
+def _offloads(fn):
+    """True if blocking validator *fn* should be run on an executor."""
+    batches = _context.batches
+    return (batches is not None and batches.executor is not None and
+            getattr(fn, 'blocking', False))
+
+
+def _call_batched(element, state, fn, validators):
+    """Call a batch validator *fn* for *element*, possibly deferred."""
+    batches = _context.batches
+    if batches is not None:
+        return batches.defer(element, state, fn, validators)
+    return _batch_results(fn, [element], state)[0]
+
+
+def _batch_results(fn, elements, state):
+    """Call batch validator *fn*, checking it has a result per element."""
+    results = list(fn.validate_batch(elements, state))
+    if len(results) != len(elements):
+        raise ValueError(
+            "%r.validate_batch() returned %d results for %d elements" % (
+                fn, len(results), len(elements)))
+    return results
+
+
+def _descended(element, validated, valid, elements, validity):
+    """Record a deferred descent *validated* and queue *element*'s children.
+
+    States are recorded in *validity*, by element id, if it is not None.
+    Returns the updated overall validity *valid*.
+
+    """
+    while validated.__class__ is _Deferred:
+        validated = validated.result
+    if validated is Unevaluated:
+        down = validated
+    else:
+        down = bool(validated)
+        if valid:
+            valid &= validated
+    if validity is None:
+        element.valid = down
+    else:
+        validity[id(element)] = down
+    if not (element._validation_plan[3] or validated is SkipAll or
+            validated is SkipAllFalse):
+        elements.extend(element.children)
+    return valid
+
+
+def _descended_incrementally(element, validated, valid):
+    """Record the descent *validated* of an incrementally validated *element*.
+
+    Returns the updated overall validity *valid*.
+
+    """
+    while validated.__class__ is _Deferred:
+        validated = validated.result
+    element._descended = validated
+    element._descended_messages = _message_counts(element)
+    if validated is Unevaluated:
+        element.valid = validated
+    else:
+        element.valid = bool(validated)
+        if valid:
+            valid &= validated
+    return valid
+
+
+def _await_sync(awaitable):
+    """Run *awaitable* to completion in this thread's private event loop."""
+    import asyncio
+    running = getattr(asyncio, '_get_running_loop', None)
+    if running is not None and running() is not None:
+        if hasattr(awaitable, 'close'):
+            awaitable.close()
+        raise RuntimeError(
+            "a validator returned an awaitable while an event loop is "
+            "running; use Element.validate_async() instead of validate()")
+    loop = _context.loop
+    if loop is None or loop.is_closed():
+        loop = _context.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(awaitable)
+
+
 def validate_element(element, state, validators):
     """Apply a set of validators to an element.
 
@@ -906,6 +2123,28 @@ def validate_element(element, state, validators):
     Emits :class:`flatland.signals.validator_validated` after each
     validator is tested.
 
+    Validators whose class provides a ``validate_batch(elements, state)``
+    method are batch validators.  ``validate_batch`` returns one result for
+    each of *elements*, as a validator call would for each alone.  During
+    :meth:`Element.validate`, calls of a batch validator are deferred and
+    made once for all elements of a tree level sharing the validator, with
+    the remaining validators of each element run afterwards.  Elsewhere,
+    batches hold a single element.
+
+    Validators may return an awaitable, such as a coroutine.  Within
+    :meth:`Element.validate_async` the remaining validation is returned as a
+    coroutine for the caller to await.  Otherwise the awaitable is run to
+    completion in an event loop kept for the current thread, and
+    :exc:`RuntimeError` is raised if an event loop is already running.
+
+    Validators with a true ``commutative`` attribute declare that they may
+    run before or after any adjacent commutative validator.  They must
+    return a plain truth value and leave the element unchanged.  For
+    elements with :attr:`~Element.adaptive_validation`, each run of
+    adjacent commutative validators is ordered by increasing cost per
+    failure, as observed in earlier validations of the element's class.
+    Batch and blocking validators keep their place.
+
     """
     if element.is_empty and element.optional:
         return True
@@ -915,15 +2154,74 @@ def validate_element(element, state, validators):
             validator_validated.send(
                 NotEmpty, element=element, state=state, result=valid)
         return valid
-    for fn in validators:
-        valid = fn(element, state)
-        if validator_validated.receivers:
-            validator_validated.send(
-                fn, element=element, state=state, result=valid)
-        if valid is None:
-            return False
-        elif valid is Skip:
+    chain = None
+    if element.adaptive_validation:
+        chain = _chain(type(element), validators)
+        if chain is not None:
+            validators = chain.ordered
+    return _run_validators(element, state, iter(validators), chain)
+
+
+#: Returned by _outcome() when validation goes on to the next validator.
+_Next = symbol('Next')
+
+
+def _outcome(element, state, fn, valid):
+    """Interpret validator *fn*'s result *valid*.
+
+    Returns the outcome of the element's validation, or :data:`_Next` if
+    the remaining validators are to be run.
+
+    """
+    if validator_validated.receivers:
+        validator_validated.send(
+            fn, element=element, state=state, result=valid)
+    if valid is None:
+        return False
+    elif valid is Skip:
+        return True
+    elif not valid or valid is SkipAll:
+        return valid
+    return _Next
+
+
+def _run_validators(element, state, validators, chain=None, fn=None,
+                    valid=None):
+    """Call the *validators* iterator's validators for *element* in order.
+
+    If *fn* is given, validation resumes from its result *valid*.  Returns
+    the outcome of validation, or a :class:`_Deferred` or coroutine
+    finishing it.  Calls are timed for *chain*, an optional
+    :class:`_Chain`.
+
+    """
+    while True:
+        if fn is not None:
+            if valid is not True and _isawaitable(valid):
+                if _context.asynchronous:
+                    from flatland.schema.asyncsupport import (
+                        finish_validation)
+                    return finish_validation(
+                        element, state, valid, fn, validators)
+                valid = _await_sync(valid)
+            outcome = _outcome(element, state, fn, valid)
+            if outcome is not _Next:
+                return outcome
+        fn = next(validators, None)
+        if fn is None:
             return True
-        elif not valid or valid is SkipAll:
-            return valid
-    return True
+        batched = _batching.get(fn.__class__)
+        if batched is None:
+            batched = _is_batched(fn)
+        if batched:
+            valid = _call_batched(element, state, fn, validators)
+            if valid.__class__ is _Deferred:
+                return valid
+        elif _offloads(fn):
+            return _context.batches.submit(element, state, fn, validators)
+        elif chain is not None and id(fn) in chain.positions:
+            started = _clock()
+            valid = fn(element, state)
+            chain.record(fn, _clock() - started, valid)
+        else:
+            valid = fn(element, state)
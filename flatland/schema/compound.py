@@ -180,6 +180,9 @@ class Compound(six.with_metaclass(_MetaCompound, _CompoundBase)):
     def _set_flat(self, pairs, sep):
         Mapping._set_flat(self, pairs, sep)
 
+    def _flat_sink(self, sep):
+        return Mapping._flat_sink(self, sep)
+
     def __repr__(self):
         try:
             return Scalar.__repr__(self)
@@ -319,6 +322,9 @@ class JoinedString(Array, String):
     def _set_flat(self, pairs, sep):
         return Scalar._set_flat(self, pairs, sep)
 
+    def _flat_sink(self, sep):
+        return Scalar._flat_sink(self, sep)
+
     @property
     def value(self):
         """A read-only :attr:`separator`-joined string of child values."""
@@ -1,5 +1,4 @@
 # -*- coding: utf-8; fill-column: 78 -*-
-from collections import defaultdict
 import re
 
 from flatland.util import (
@@ -9,10 +8,18 @@ from flatland.util import (
     class_cloner,
     decode_repr,
     keyslice_pairs,
-    re_uescape,
     to_pairs,
     )
-from .base import Element, Unevaluated, Slot, validate_element
+from .base import Element, Slot, validate_element
+from .routing import (
+    consume,
+    field_trie,
+    flat_sink,
+    load_flat,
+    name_prefix,
+    routes_flat,
+    unrouted_key,
+    )
 from .scalars import Scalar
 import six
 from six.moves import xrange
@@ -27,6 +34,8 @@ __all__ = (
     'Sequence',
     )
 
+_index_token = re.compile(u'\\d+\\Z', re.UNICODE).match
+
 
 class Container(Element):
     """Holds other schema items.
@@ -49,6 +58,9 @@ class Container(Element):
 
     validates_up = 'validators'
 
+    # descent validation is opt-in through descent_validators
+    _default_descent_validation = False
+
     descent_validators = ()
     """TODO: doc descent_validators"""
 
@@ -119,22 +131,6 @@ class Container(Element):
         else:
             return validate_element(element, state, self.validators)
 
-    def _validate(self, state, descending):
-        """Run validation, transforming None into success. Internal."""
-        # FIXME: refactor this to allow for this logic ("Don't apply default
-        # validation on downward pass") to be defined declaratively.
-        if descending:
-            if self.validates_down:
-                validators = getattr(self, self.validates_down, None)
-                if not validators:
-                    return Unevaluated
-                return validate_element(self, state, validators)
-        else:
-            if self.validates_up:
-                validators = getattr(self, self.validates_up, None)
-                return validate_element(self, state, validators)
-        return Unevaluated
-
 
 class Sequence(Container, list):
     """Abstract base of sequence-like Containers.
@@ -180,6 +176,13 @@ class Sequence(Container, list):
             raise TypeError("Invalid schema: %r has no member_schema" %
                             type(self))
 
+    @classmethod
+    def compacted(cls):
+        compact = super(Sequence, cls).compacted()
+        if isinstance(cls.member_schema, type):
+            compact.member_schema = cls.member_schema.compacted()
+        return compact
+
     @class_cloner
     def of(cls, *schema):
         """Declare the class to hold a sequence of *\*schema*.
@@ -271,6 +274,13 @@ class Sequence(Container, list):
     def _set_flat(self, pairs, sep):
         raise NotImplementedError()
 
+    def _clone_children(self, clone):
+        list.extend(clone, [child._clone(clone)
+                            for child in list.__iter__(self)])
+
+    def _reset_children(self):
+        del self[:]
+
     @property
     def children(self):
         return iter(self)
@@ -412,7 +422,7 @@ class ListSlot(Container, Slot):
 
     def __init__(self, name, parent, element):
         self.name = name
-        self.parent = parent
+        self._parent = parent
         self.element = element
         element.parent = self
 
@@ -424,6 +434,15 @@ class ListSlot(Container, Slot):
     def value(self):
         return self.element.value
 
+    def _clone_children(self, clone):
+        clone.element = self.element._clone(clone)
+
+    def _rename(self, name):
+        """Set the slot's positional :attr:`name`."""
+        if name != self.name:
+            self.name = name
+            self._forget_path()
+
     def __repr__(self):
         return '<ListSlot[%r] for %r>' % (self.name, self.element)
 
@@ -539,66 +558,17 @@ class List(Sequence):
 
     def _renumber(self):
         for idx, slot in enumerate(self._slots):
-            slot.name = six.text_type(str(idx))
+            slot._rename(six.text_type(str(idx)))
 
     @property
     def children(self):
         return iter(child.element for child in self._slots)
 
     def _set_flat(self, pairs, sep):
-        del self[:]
-
-        if not pairs:
-            return
+        load_flat(self, pairs, sep)
 
-        if self.name:
-            regex = re.compile(u'^%s(\\d+)(?:%s|$)' % (
-                re_uescape(self.name + sep), re_uescape(sep)), re.UNICODE)
-        else:
-            regex = re.compile(u'^(\\d+)(?:%s|$)' % (
-                re_uescape(sep)), re.UNICODE)
-
-        indexes = defaultdict(list)
-        prune = self.prune_empty
-
-        for key, value in pairs:
-            if value == u'' and prune:
-                continue
-            m = regex.match(key)
-            if not m:
-                continue
-            try:
-                index = int(m.group(1))
-            except TypeError:
-                # Ignore keys with outrageously large indexes- they
-                # aren't valid data for us.
-                pass
-            else:
-                child_key = key[len(m.group(0)):] or None
-                indexes[index].append((child_key, value))
-
-        if not indexes:
-            return
-
-        # lossy: missing (or empty-valued) indexes are omitted.
-        #        the python indexes may not match the flat indexes
-        if prune:
-            for offset, index in enumerate(sorted(indexes)):
-                if offset == self.maximum_set_flat_members:
-                    break
-                slot = self._new_slot()
-                list.append(self, slot)
-                slot.element.set_flat(indexes[index], sep)
-        # lossless: elements are built up to the highest seen index or a
-        #           schema-configured maximum. flat + python indexes match.
-        else:
-            max_index = min(max(indexes) + 1, self.maximum_set_flat_members)
-            for index in xrange(0, max_index):
-                slot = self._new_slot()
-                list.append(self, slot)
-                flat = indexes.get(index, None)
-                if flat:
-                    slot.element.set_flat(flat, sep)
+    def _flat_sink(self, sep):
+        return _ListSink(self, sep)
 
     def set_default(self):
         """set() the element to the schema default.
@@ -645,42 +615,10 @@ class Array(Sequence):
     flattenable = False
 
     def _set_flat(self, pairs, sep):
-        del self[:]
-        prune = self.prune_empty
-        child_name = self.member_schema.name
-
-        # TODO: some complexity snuck in below with the thought of supporting
-        # arrays of containers.  they're *not* working yet.
-        assert not issubclass(self.member_schema, Container), \
-               "Flattened Arrays are only supported for scalar child types."
+        load_flat(self, pairs, sep)
 
-        if not self.name:
-            child_prefix = child_name or u''
-            for key, value in pairs:
-                if prune and value == u'' and key == child_prefix:
-                    continue
-                if key == u'':
-                    key = None
-                if child_name and key != child_name:
-                    continue
-                member = self.member_schema.from_flat([(key, value)])
-                self.append(member)
-        else:
-            regex = re.compile(u'^(%s(?:%s|$))' % (
-                re_uescape(self.name), re_uescape(sep)), re.UNICODE)
-            for key, value in pairs:
-                m = regex.match(key)
-                if not m:
-                    continue
-                remainder = key[m.end():] or None
-                if child_name and not remainder:
-                    continue
-                elif remainder and not child_name:
-                    continue
-                elif prune and value == u'' and remainder == child_name:
-                    continue
-                member = self.member_schema.from_flat([(remainder, value)])
-                self.append(member)
+    def _flat_sink(self, sep):
+        return _ArraySink(self, sep)
 
 
 class MultiValue(Array, Scalar):
@@ -749,6 +687,13 @@ class Mapping(Container, dict):
         if value is not Unspecified:
             self.set(value)
 
+    @classmethod
+    def compacted(cls):
+        compact = super(Mapping, cls).compacted()
+        compact.field_schema = tuple(field.compacted()
+                                     for field in cls.field_schema)
+        return compact
+
     def __setitem__(self, key, value):
         if not key in self:
             raise TypeError('May not set unknown key %r on %s %r' %
@@ -775,6 +720,14 @@ class Mapping(Container, dict):
             dict.__setitem__(
                 self, key, member_schema(parent=self))
 
+    def _clone_children(self, clone):
+        for key, child in dict.items(self):
+            dict.__setitem__(clone, key, child._clone(clone))
+
+    def _reset_children(self):
+        for child in dict.values(self):
+            child.reset()
+
     def popitem(self):
         raise TypeError('%s keys are immutable.' % type(self).__name__)
 
@@ -835,35 +788,10 @@ class Mapping(Container, dict):
         return converted
 
     def _set_flat(self, pairs, sep):
-        if self.name is None:
-            possibles = pairs  # accept all
-        else:
-            possibles = []
-            prefix = self.name + sep
-            plen = len(prefix)
-            for key, value in pairs:
-                if key == prefix:
-                    # No flat representation of mappings, ignore.
-                    pass
-                if key.startswith(prefix):
-                    # accept child element
-                    possibles.append((key[plen:], value))
-
-        if not possibles:
-            return
+        load_flat(self, pairs, sep)
 
-        for schema in self.field_schema:
-            field = schema.name
-            accum = []
-            for key, value in possibles:
-                if key.startswith(field):
-                    accum.append((key, value))
-            if accum:
-                if dict.__contains__(self, field):
-                    self[field].set_flat(accum, sep)
-                else:
-                    self[field] = schema()
-                    self[field].set_flat(accum, sep=sep)
+    def _flat_sink(self, sep):
+        return _MappingSink(self, sep)
 
     def set_default(self):
         default = self.default_value
@@ -922,6 +850,100 @@ class Dict(Mapping, dict):
     See :ref:`set_policy`
     """
 
+    lazy_fields = False
+    """If True, child elements are created on first use.  Default False.
+
+    Fields are created individually when accessed by key and all at once
+    when the mapping is examined as a whole, such as through
+    :attr:`children`, :attr:`value` or iteration.  Flat loading creates only
+    the fields that receive data.  Otherwise the mapping behaves as if every
+    field had been created up front.
+    """
+
+    _deferred = False
+
+    def _reset(self):
+        if not self.lazy_fields:
+            return Mapping._reset(self)
+        dict.clear(self)
+        self._deferred = True
+
+    def _materialize(self):
+        """Create any deferred fields, leaving the mapping in schema order."""
+        if not self._deferred:
+            return
+        self._deferred = False
+        existing = dict(dict.items(self))
+        dict.clear(self)
+        for member_schema in self.field_schema:
+            key = member_schema.name
+            child = existing.get(key)
+            if child is None:
+                child = member_schema(parent=self)
+            dict.__setitem__(self, key, child)
+
+    def __missing__(self, key):
+        if self._deferred:
+            member_schema = _field_index(self).get(key)
+            if member_schema is not None:
+                child = member_schema(parent=self)
+                dict.__setitem__(self, key, child)
+                return child
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if self._deferred:
+            return key in _field_index(self)
+        return dict.__contains__(self, key)
+
+    def __len__(self):
+        if self._deferred:
+            return len(self.field_schema)
+        return dict.__len__(self)
+
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    if six.PY2:  # pragma: nocover
+        def iterkeys(self):
+            self._materialize()
+            return dict.iterkeys(self)
+
+        def itervalues(self):
+            self._materialize()
+            return dict.itervalues(self)
+
+        def iteritems(self):
+            self._materialize()
+            return dict.iteritems(self)
+
+    def copy(self):
+        self._materialize()
+        return dict.copy(self)
+
+    def __repr__(self):
+        self._materialize()
+        return dict.__repr__(self)
+
+    @property
+    def children(self):
+        # order not guaranteed
+        self._materialize()
+        return six.itervalues(self)
+
     @class_cloner
     def of(cls, *fields):
         """TODO: doc of()"""
@@ -996,7 +1018,7 @@ class Dict(Mapping, dict):
                         'Dict %r schema does not allow key %r' % (
                             self.name, key))
                 continue
-            if dict.__contains__(self, key):
+            if key in self:
                 converted &= self[key].set(value)
             else:
                 self[key] = el = fields[key]()
@@ -1138,6 +1160,16 @@ class SparseDict(Dict):
     def may_contain(self, key):
         return key in self or self._field_schema_for(key) is not None
 
+    def _reset_children(self):
+        for member_schema in self.field_schema:
+            key = member_schema.name
+            if not dict.__contains__(self, key):
+                continue
+            if self.minimum_fields is None or member_schema.optional:
+                dict.__delitem__(self, key)
+            else:
+                self[key].reset()
+
     def _reset(self):
         dict.clear(self)
         for member_schema in self.field_schema:
@@ -1240,6 +1272,195 @@ class SparseDict(Dict):
                                (self.minimum_fields,))
 
 
+def _field_index(element):
+    """Return a name -> schema mapping of a Mapping's fields, cached."""
+    cls = type(element)
+    field_schema = element.field_schema
+    cached = cls.__dict__.get('_field_index')
+    if cached is not None and cached[0] is field_schema:
+        return cached[1]
+    index = dict((schema.name, schema) for schema in field_schema)
+    if field_schema is cls.field_schema:
+        cls._field_index = (field_schema, index)
+    return index
+
+
+class _ListSink(object):
+    """Loads routed flat entries into a List, one indexed member at a time.
+
+    Members are built as soon as their index is first seen and filled as
+    entries arrive, but are only attached to the list on :meth:`close`,
+    once every index is known.
+
+    """
+
+    def __init__(self, element, sep):
+        del element[:]
+        self.element = element
+        self.name = element.name or None
+        self.sep = sep
+        self.prune = element.prune_empty
+        self.limit = element.maximum_set_flat_members
+        self.member_prefix = name_prefix(element.member_schema.name, sep)
+        self.members = {}
+        self.highest = -1
+
+    def feed(self, path, pos, value):
+        if value == u'' and self.prune:
+            return
+        if pos >= len(path) or not _index_token(path[pos]):
+            return
+        try:
+            index = int(path[pos])
+        except (TypeError, ValueError):
+            return
+        members = self.members
+        member = members.get(index)
+        if member is None:
+            member = self._open_member(index)
+            if member is None:
+                return
+        end = pos + 1
+        # 'list_0_' addresses the same member as 'list_0'
+        if end == len(path) - 1 and path[end] == u'':
+            end += 1
+        end = consume(path, end, self.member_prefix)
+        if end is not None:
+            member[1].feed(path, end, value)
+
+    def _open_member(self, index):
+        members = self.members
+        if self.prune:
+            # lossy: only the lowest indexes are kept
+            if len(members) == self.limit:
+                highest = max(members)
+                if index > highest:
+                    return None
+                del members[highest]
+        else:
+            # lossless: gaps below the highest index are filled on close
+            self.highest = max(self.highest, index)
+            if index >= self.limit:
+                return None
+        element = self.element
+        slot = element.slot_type(name=six.text_type(index),
+                                 parent=element,
+                                 element=element._as_element(Unspecified))
+        member = members[index] = (slot, flat_sink(slot.element, self.sep))
+        return member
+
+    def close(self):
+        element, members = self.element, self.members
+        if self.prune:
+            # the python indexes may not match the flat indexes
+            slots = [members[index][0] for index in sorted(members)]
+        else:
+            # flat + python indexes match
+            slots = []
+            for index in xrange(0, min(self.highest + 1, self.limit)):
+                member = members.get(index)
+                slots.append(member[0] if member else element._new_slot())
+        for position, slot in enumerate(slots):
+            slot._rename(six.text_type(position))
+            list.append(element, slot)
+        for index in sorted(members):
+            members[index][1].close()
+
+
+class _ArraySink(object):
+    """Loads routed flat entries into an Array, one member per entry."""
+
+    def __init__(self, element, sep):
+        del element[:]
+        schema = element.member_schema
+
+        # TODO: some complexity snuck in below with the thought of supporting
+        # arrays of containers.  they're *not* working yet.
+        assert not issubclass(schema, Container), \
+               "Flattened Arrays are only supported for scalar child types."
+
+        self.element = element
+        self.name = element.name or None
+        self.sep = sep
+        self.prune = element.prune_empty
+        self.child_name = schema.name
+        # scalars take the value of a pair bearing their name; build them
+        # directly rather than through a throwaway pair list apiece.
+        self.direct = issubclass(schema, Scalar) and routes_flat(schema)
+
+    def feed(self, path, pos, value):
+        child_name = self.child_name
+        key = unrouted_key(None, path, pos, self.sep)
+        if self.name is None:
+            if self.prune and value == u'' and key == (child_name or u''):
+                return
+            if key == u'':
+                key = None
+            if child_name and key != child_name:
+                return
+        else:
+            key = key or None
+            if child_name and not key:
+                return
+            elif key and not child_name:
+                return
+            elif self.prune and value == u'' and key == child_name:
+                return
+        element, schema = self.element, self.element.member_schema
+        if not self.direct:
+            element.append(schema.from_flat([(key, value)]))
+            return
+        member = schema()
+        if key == child_name:
+            member.set(value)
+        member.parent = element
+        list.append(element, member)
+
+    def close(self):
+        pass
+
+
+class _MappingSink(object):
+    """Loads routed flat entries into the fields of a Mapping."""
+
+    def __init__(self, element, sep):
+        self.element = element
+        self.name = element.name
+        self.sep = sep
+        # one trie walk per key finds every field owning it
+        self.trie = field_trie(element, sep)
+        self.children = [None] * self.trie.size
+
+    def feed(self, path, pos, value):
+        children = self.children
+        for index, schema, end in self.trie.match(path, pos):
+            child = children[index]
+            if child is None:
+                child = children[index] = self._open_child(schema)
+            child[1].feed(path, end, value)
+
+    def _open_child(self, schema):
+        element, field = self.element, schema.name
+        if field in element:
+            child, missing = element[field], False
+        else:
+            # sparse fields join the mapping on close, in schema order
+            child, missing = schema(), True
+            child.parent = element
+        return child, flat_sink(child, self.sep), missing
+
+    def close(self):
+        element = self.element
+        for index, schema in enumerate(element.field_schema):
+            opened = self.children[index]
+            if opened is None:
+                continue
+            child, sink, missing = opened
+            if missing:
+                element[schema.name] = child
+            sink.close()
+
+
 for cls_name in __all__:
     autodocument_from_superclasses(globals()[cls_name])
 del cls_name
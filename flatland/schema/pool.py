@@ -0,0 +1,93 @@
+# -*- coding: utf-8; fill-column: 78 -*-
+"""Reuse of element trees across requests."""
+from contextlib import contextmanager
+
+from flatland.util import threading
+
+
+__all__ = 'ElementPool',
+
+
+class ElementPool(object):
+    """A bounded pool of reusable elements of a single schema.
+
+    Elements are returned to the pool with :meth:`release`, which
+    :meth:`~flatland.schema.base.Element.reset` them in place so that the next
+    :meth:`acquire` can hand them out as if newly constructed::
+
+      pool = ElementPool(SignupForm, maxsize=32)
+
+      with pool.element() as form:
+          form.set_flat(request.form)
+          if form.validate():
+              ...
+
+    At most *maxsize* idle elements are kept; elements released to a full
+    pool are left for the garbage collector.
+
+    """
+
+    def __init__(self, schema, maxsize=16):
+        self.schema = schema
+        self.maxsize = maxsize
+        self._idle = []
+        self._idle_ids = set()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return an idle element from the pool, or construct a new one."""
+        with self._lock:
+            if self._idle:
+                element = self._idle.pop()
+                self._idle_ids.discard(id(element))
+                return element
+        return self.schema()
+
+    def release(self, element):
+        """Reset *element* and return it to the pool.
+
+        :param element: an element acquired from this pool.  Elements of
+          another schema, and elements already released, raise
+          :exc:`TypeError`.
+
+        """
+        if type(element) is not self.schema:
+            raise TypeError("%r is not an element of %r" % (
+                element, self.schema))
+        if element.parent is not None:
+            raise TypeError("only root elements may be pooled")
+        with self._lock:
+            if id(element) in self._idle_ids:
+                raise TypeError("%r was already released" % (element,))
+            # claimed here so that a concurrent release() fails as well
+            self._idle_ids.add(id(element))
+        pooled = False
+        try:
+            element.reset()
+            with self._lock:
+                if len(self._idle) < self.maxsize:
+                    self._idle.append(element)
+                    pooled = True
+        finally:
+            if not pooled:
+                with self._lock:
+                    self._idle_ids.discard(id(element))
+
+    @contextmanager
+    def element(self):
+        """A context manager acquiring an element and releasing it on exit."""
+        element = self.acquire()
+        try:
+            yield element
+        finally:
+            self.release(element)
+
+    def clear(self):
+        """Discard all idle elements."""
+        with self._lock:
+            del self._idle[:]
+            self._idle_ids.clear()
+
+    def __len__(self):
+        """The number of idle elements held."""
+        return len(self._idle)
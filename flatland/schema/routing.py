@@ -0,0 +1,275 @@
+# -*- coding: utf-8; fill-column: 78 -*-
+"""Single-pass routing of flat ``(key, value)`` pairs into element trees.
+
+Flat keys are split on the separator exactly once, at the element receiving
+:meth:`~flatland.schema.base.Element.set_flat`.  The resulting token path is
+carried down the tree along with a position marking how much of the path has
+been consumed by the element names above.  Mappings consult a per-class
+:class:`FieldTrie` to find the fields a path belongs to without rescanning
+the input once per field.
+
+Routed entries are ``(path, pos, value)`` 3-tuples.  ``path[pos:]`` are the
+tokens remaining below the receiving element.  Entries are delivered one at a
+time to a *sink*, an object with ``feed(path, pos, value)`` and ``close()``
+methods that loads them into a single element, opening sinks for children as
+entries arrive.  Element types provide their sink through ``_flat_sink(sep)``.
+
+"""
+from weakref import WeakKeyDictionary
+
+from flatland.util import LRUCache, Unspecified
+from .base import Unset
+
+
+__all__ = 'FlatLoader',
+
+_tries = WeakKeyDictionary()
+_routable = WeakKeyDictionary()
+#: Split element names, by name and separator.
+_name_tokens = LRUCache(maxsize=1024)
+
+#: Marks the field schema stored at a trie node.
+_terminal = None
+
+
+class FieldTrie(object):
+    """A token trie of a Mapping's flattened field names."""
+
+    __slots__ = 'root', 'size'
+
+    def __init__(self, field_schema, sep):
+        self.root = root = {}
+        self.size = len(field_schema)
+        for index, schema in enumerate(field_schema):
+            if schema.name is None:
+                continue
+            node = root
+            for token in schema.name.split(sep):
+                node = node.setdefault(token, {})
+            node[_terminal] = (index, schema)
+
+    def match(self, path, pos):
+        """Yield ``(index, schema, end)`` for fields that own ``path[pos:]``.
+
+        A field owns a path if its name tokens are a prefix of the path.
+        *end* is the position following the field's name.
+
+        """
+        node, end, length = self.root, pos, len(path)
+        while end < length:
+            node = node.get(path[end])
+            if node is None:
+                return
+            end += 1
+            found = node.get(_terminal)
+            if found is not None:
+                yield found[0], found[1], end
+
+
+def field_trie(element, sep):
+    """Return the :class:`FieldTrie` for a Mapping *element* and *sep*."""
+    field_schema = element.field_schema
+    cls = type(element)
+    if field_schema is not cls.field_schema:
+        # instance-level field overrides aren't worth caching
+        return FieldTrie(field_schema, sep)
+    try:
+        by_sep = _tries[cls]
+    except KeyError:
+        by_sep = _tries[cls] = {}
+    cached = by_sep.get(sep)
+    if cached is None or cached[0] is not field_schema:
+        cached = by_sep[sep] = (field_schema, FieldTrie(field_schema, sep))
+    return cached[1]
+
+
+def name_tokens(name, sep):
+    """Return *name* split on *sep* as a tuple, memoized."""
+    tokens = _name_tokens.get((name, sep))
+    if tokens is None:
+        tokens = tuple(name.split(sep))
+        _name_tokens.put((name, sep), tokens)
+    return tokens
+
+
+def name_prefix(name, sep):
+    """Return the tokens a key must start with to address *name*."""
+    if name is None:
+        return None
+    return name_tokens(name, sep)
+
+
+def consume(path, pos, prefix):
+    """Return the position after *prefix* in *path*, or None if absent."""
+    if prefix is None:
+        return pos
+    end = pos + len(prefix)
+    if end > len(path):
+        return None
+    for token in prefix:
+        if path[pos] != token:
+            return None
+        pos += 1
+    return end
+
+
+def parse_flat(pairs, name, sep):
+    """Split flat *pairs* into routed entries below an element *name*.
+
+    Keys not beginning with *name* are dropped.  A *name* of None accepts
+    every key.
+
+    """
+    prefix = name_prefix(name, sep)
+    for key, value in pairs:
+        if key is None:
+            if prefix is None:
+                yield (), 0, value
+            continue
+        path = key.split(sep)
+        pos = consume(path, 0, prefix)
+        if pos is not None:
+            yield path, pos, value
+
+
+def unrouted_key(name, path, pos, sep):
+    """Rebuild the flat key an element named *name* would have received."""
+    rest = sep.join(path[pos:]) if pos < len(path) else None
+    if name is None:
+        return rest
+    elif rest is None:
+        return name
+    return name + sep + rest
+
+
+def routes_flat(cls):
+    """True if *cls* may be loaded by its sink in place of set_flat()."""
+    try:
+        return _routable[cls]
+    except KeyError:
+        pass
+    mro = cls.__mro__
+    definers = []
+    for attribute in ('_flat_sink', '_set_flat', 'set_flat'):
+        for index, base in enumerate(mro):
+            if attribute in base.__dict__:
+                definers.append(index)
+                break
+        else:
+            definers.append(len(mro))
+    routable = _routable[cls] = definers[0] <= min(definers[1:])
+    return routable
+
+
+def flat_sink(element, sep):
+    """Return a sink loading routed entries into *element*.
+
+    The sink behaves as ``set_flat`` would given every entry at once.  The
+    name of *element* must already be consumed by each entry fed to it.
+    Elements that customize :meth:`~flatland.schema.base.Element.set_flat`
+    are buffered and handed rebuilt pairs on close.
+
+    """
+    if routes_flat(type(element)):
+        element.raw = Unset
+        return element._flat_sink(sep)
+    return PairSink(element, sep)
+
+
+def load_flat(element, pairs, sep):
+    """Route flat *pairs* into *element* through its own sink."""
+    sink = element._flat_sink(sep)
+    feed = sink.feed
+    for path, pos, value in parse_flat(pairs, sink.name, sep):
+        feed(path, pos, value)
+    sink.close()
+
+
+class PairSink(object):
+    """Buffers entries for an element and calls its set_flat() on close."""
+
+    __slots__ = 'element', 'name', 'sep', 'pairs'
+
+    def __init__(self, element, sep, name=Unspecified):
+        self.element = element
+        self.name = element.name if name is Unspecified else name
+        self.sep = sep
+        self.pairs = []
+
+    def feed(self, path, pos, value):
+        self.pairs.append(
+            (unrouted_key(self.name, path, pos, self.sep), value))
+
+    def close(self):
+        self.element.set_flat(self.pairs, self.sep)
+
+
+class FlatLoader(object):
+    """Incrementally loads flat ``(key, value)`` pairs into an element.
+
+    Pairs are routed into the element tree as they are fed, rather than
+    collected for a single :meth:`~flatland.schema.base.Element.set_flat`.
+    Once all pairs have been fed, :meth:`close` finishes the load; the
+    result is the same as calling ``set_flat`` with every pair fed.
+
+    Usually obtained from :meth:`~flatland.schema.base.Element.flat_loader`
+    and used as a context manager::
+
+      with form.flat_loader() as loader:
+          for key, value in parsed_request_body:
+              loader.feed(key, value)
+
+    Leaving the ``with`` block because of an exception does not close the
+    loader, leaving the partially loaded element as-is.
+
+    Lists can not place their members until every index is known, so list
+    members are filled as their pairs arrive but only attached to the list
+    on :meth:`close`.  Elements that customize ``set_flat`` are buffered
+    until :meth:`close`.
+
+    """
+
+    def __init__(self, element, sep=u'_'):
+        self.element = element
+        self.sep = sep
+        self.closed = False
+        if routes_flat(type(element)):
+            element.raw = Unset
+            self._sink = element._flat_sink(sep)
+        else:
+            # keys are handed over whole to a customized set_flat
+            self._sink = PairSink(element, sep, name=None)
+        self._prefix = name_prefix(self._sink.name, sep)
+
+    def feed(self, key, value):
+        """Route one flat *key* and *value* into the element."""
+        if self.closed:
+            raise RuntimeError("feed() on a closed %s" % type(self).__name__)
+        if key is None:
+            if self._prefix is None:
+                self._sink.feed((), 0, value)
+            return
+        path = key.split(self.sep)
+        pos = consume(path, 0, self._prefix)
+        if pos is not None:
+            self._sink.feed(path, pos, value)
+
+    def update(self, pairs):
+        """Feed a sequence of ``(key, value)`` pairs or a dict."""
+        if hasattr(pairs, 'items'):
+            pairs = pairs.items()
+        for key, value in pairs:
+            self.feed(key, value)
+
+    def close(self):
+        """Finish loading.  Further calls are ignored."""
+        if not self.closed:
+            self.closed = True
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
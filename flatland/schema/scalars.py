@@ -126,6 +126,9 @@ class Scalar(Element):
                 self.set(value)
                 break
 
+    def _flat_sink(self, sep):
+        return _ScalarSink(self)
+
     def set_default(self):
         default = self.default_value
         if default is not Unspecified:
@@ -163,6 +166,25 @@ class Scalar(Element):
             return None
 
 
+class _ScalarSink(object):
+    """Sets a Scalar from the first routed entry naming it exactly."""
+
+    __slots__ = 'element', 'name', 'done'
+
+    def __init__(self, element):
+        self.element = element
+        self.name = element.name
+        self.done = False
+
+    def feed(self, path, pos, value):
+        if not self.done and pos == len(path):
+            self.element.set(value)
+            self.done = True
+
+    def close(self):
+        pass
+
+
 class String(Scalar):
     """A regular old Unicode string."""
 
@@ -6,6 +6,8 @@ deferred_module.shadow(
     'flatland.util',
     {
         'base': (
+            'ClassCache',
+            'LRUCache',
             'Maybe',
             'Unspecified',
             'adict',
@@ -14,6 +16,7 @@ deferred_module.shadow(
             'assignable_property',
             'autodocument_from_superclasses',
             'class_cloner',
+            'cloned_classes',
             'decorator',
             'decode_repr',
             'format_argspec_plus',
@@ -2,6 +2,7 @@
 import re
 import string
 import sys
+from collections import OrderedDict
 import six
 
 try:
@@ -118,6 +119,89 @@ class assignable_class_property(object):
                 type(instance).__name__, self.name))
 
 
+class LRUCache(object):
+    """A bounded, thread-safe, least-recently-used cache.
+
+    Keeps at most *maxsize* entries, and counts its hits, misses and
+    evictions.  A *maxsize* of 0 disables the cache.  Cached values may not
+    be None.
+
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Return the value cached for *key*, or None."""
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Cache *value* for *key*, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a dict of cache ``hits``, ``misses``, ``evictions``,
+        current ``size`` and ``maxsize``."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'size': len(self._entries),
+                    'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ClassCache(LRUCache):
+    """A bounded, least-recently-used cache of cloned classes.
+
+    Used by :class:`class_cloner` to intern the classes it creates.  A
+    *maxsize* of 0 disables the cache.
+
+    """
+
+
+#: Classes interned by :class:`class_cloner`.  Disabled until given a
+#: positive ``maxsize``.
+cloned_classes = ClassCache()
+
+
+def _clone_key(cls, name, args, kw):
+    """Return a hashable key for a cloner call, or None."""
+    # keyed with types so that 1, 1.0 and True don't share a class
+    key = (cls, name,
+           tuple((type(arg), arg) for arg in args),
+           tuple(sorted((attribute, type(value), value)
+                        for attribute, value in kw.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 class class_cloner(object):
     """A class-copying ``classmethod``.
 
@@ -127,6 +211,11 @@ class class_cloner(object):
     The class_cloner is only visible at the class level.  Instance access is
     proxied to the instance dictionary.
 
+    When :data:`cloned_classes` has a positive ``maxsize``, calls with
+    hashable arguments are interned: repeating a call on the same class with
+    equal arguments returns the class created by the first call.  Interned
+    classes are shared, and should not be modified after creation.
+
     """
 
     def __init__(self, fn):
@@ -140,14 +229,35 @@ class class_cloner(object):
                 return instance.__dict__[self.name]
             except KeyError:
                 raise AttributeError(self.name)
+        if not cloned_classes.maxsize:
+            return self.cloner.__get__(None, self._clone(cls))
+        return self._interned(cls)
+
+    def _clone(self, cls, depth=2):
         members = {'__doc__': getattr(cls, '__doc__', '')}
         try:
             members['__module__'] = \
-              sys._getframe(1).f_globals['__name__']
+              sys._getframe(depth).f_globals['__name__']
         except (AttributeError, KeyError, TypeError):  # pragma: nocover
             members['__module__'] = cls.__module__
-        clone = type(cls.__name__, (cls,), members)
-        return self.cloner.__get__(None, clone)
+        return type(cls.__name__, (cls,), members)
+
+    def _interned(self, cls):
+        name, cloner = self.name, self.cloner
+
+        def interned(*args, **kw):
+            key = _clone_key(cls, name, args, kw)
+            if key is not None:
+                found = cloned_classes.get(key)
+                if found is not None:
+                    return found
+            clone = cloner.__get__(None, self._clone(cls))(*args, **kw)
+            if key is not None:
+                cloned_classes.put(key, clone)
+            return clone
+        interned.__name__ = name
+        interned.__doc__ = self.__doc__
+        return interned
 
     def __set__(self, instance, value):
         instance.__dict__[self.name] = value
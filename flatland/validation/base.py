@@ -2,6 +2,7 @@
 from operator import attrgetter
 
 from flatland.schema.util import find_i18n_function
+from flatland.util import LRUCache, threading
 import six
 
 
@@ -10,10 +11,24 @@ P_ = lambda *translatable: translatable
 _ugettext_finder = attrgetter('ugettext')
 _ungettext_finder = attrgetter('ungettext')
 
+#: Results of :attr:`~Validator.pure` validators, keyed by validator
+#: configuration and element value.  Set ``maxsize`` to 0 to disable.
+memo = LRUCache(maxsize=1024)
+
+_recording = threading.local()
+_pure_classes = {}
+
 
 class Validator(object):
     """Base class for fancy validators."""
 
+    blocking = False
+    """If True, the validator waits on I/O and may be run on an executor.
+
+    See the *executor* of :meth:`Element.validate
+    <flatland.schema.base.Element.validate>`.
+    """
+
     def __init__(self, **kw):
         """Construct a validator.
 
@@ -28,8 +43,31 @@ class Validator(object):
                 raise TypeError("%s has no attribute %r, can not override." % (
                     cls.__name__, attr))
 
+    pure = False
+    """If True, the validator is a function of the element's value alone.
+
+    The results of pure validators are memoized in :data:`memo`, keyed by the
+    validator's configuration and the element's :attr:`u` and :attr:`value`,
+    and shared by all elements, whatever their schema.  The messages noted
+    and any change to the element's value are replayed for later elements
+    with the same key.  Pure validators may not depend on *state*, other
+    elements or the outside world.  Subclasses overriding :meth:`validate`
+    are not pure unless they declare it again.
+    """
+
+    commutative = False
+    """If True, the validator may run before or after its neighbors.
+
+    Elements with :attr:`~flatland.schema.base.Element.adaptive_validation`
+    reorder runs of adjacent commutative validators by their observed costs.
+    Commutative validators must return a plain truth value and leave the
+    element unchanged.
+    """
+
     def __call__(self, element, state):
         """Adapts Validator to the Element.validate callable interface."""
+        if self.pure and memo.maxsize and _is_pure(self):
+            return _memoized(self, element, state)
         return self.validate(element, state)
 
     def validate(self, element, state):
@@ -46,6 +84,11 @@ class Validator(object):
 
         :returns: True if valid
 
+        Validators may instead implement ``validate_batch(elements, state)``,
+        returning a result for each element.  :meth:`Element.validate
+        <flatland.schema.base.Element.validate>` then validates many elements
+        with a single call.  Messages are noted on each element as usual.
+
         """
         return False
 
@@ -105,6 +148,7 @@ class Validator(object):
           assert el.errors == ['Oh noes!']
 
         """
+        _record(self, 'note_error', element, key, message, info)
         message = message or getattr(self, key)
         if message:
             element.add_error(
@@ -141,6 +185,7 @@ class Validator(object):
 
         Always returns False.
         """
+        _record(self, 'note_warning', element, key, message, info)
         message = message or getattr(self, key)
         if message:
             element.add_warning(
@@ -261,6 +306,91 @@ class Validator(object):
         return message % format_map
 
 
+def _is_pure(validator):
+    """True if *validator* may be memoized.
+
+    A class's ``pure`` only covers the :meth:`~Validator.validate` of the
+    class declaring it and its bases.
+
+    """
+    if 'pure' in validator.__dict__:
+        return validator.__dict__['pure']
+    cls = type(validator)
+    try:
+        return _pure_classes[cls]
+    except KeyError:
+        pass
+    declared = next(base for base in cls.__mro__ if 'pure' in base.__dict__)
+    defined = next(base for base in cls.__mro__
+                   if 'validate' in base.__dict__)
+    pure = _pure_classes[cls] = issubclass(declared, defined)
+    return pure
+
+
+def _memo_key(validator, element):
+    """Return the :data:`memo` key for *validator* and *element*, or None."""
+    config = tuple(sorted(six.iteritems(validator.__dict__)))
+    try:
+        hash(config)
+    except TypeError:
+        # unhashable configuration; only this instance may share results
+        config = validator
+    value = element.value
+    key = (type(validator), config, element.u, type(value), value)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _record(validator, method, element, key, message, info):
+    """Note a message call for replay, if a pure validator is running."""
+    notes = getattr(_recording, 'notes', None)
+    if notes is not None:
+        notes.append((validator, method, element, key, message, info))
+
+
+def _memoized(validator, element, state):
+    """Call a pure *validator*, through :data:`memo`."""
+    key = _memo_key(validator, element)
+    if key is None:
+        return validator.validate(element, state)
+
+    found = memo.get(key)
+    if found is not None:
+        valid, notes, changed = found
+        if changed is not None:
+            element.raw, element.u, element.value = changed
+        for noter, method, message_key, message, info in notes:
+            getattr(noter, method)(element, state, message_key, message,
+                                   **info)
+        return valid
+
+    before = (element.raw, element.u, element.value)
+    notes, previous = [], getattr(_recording, 'notes', None)
+    _recording.notes = notes
+    try:
+        valid = validator.validate(element, state)
+    finally:
+        _recording.notes = previous
+    if previous is not None:
+        previous.extend(notes)
+
+    if not (valid is None or isinstance(valid, int)):
+        # awaitables and other exotic results aren't reusable
+        return valid
+    if any(noted[2] is not element for noted in notes):
+        return valid
+    after = (element.raw, element.u, element.value)
+    changed = None
+    if any(old is not new for old, new in zip(before, after)):
+        changed = after
+    memo.put(key, (valid, tuple((noted[0], noted[1], noted[3], noted[4],
+                                 noted[5]) for noted in notes), changed))
+    return valid
+
+
 class as_format_mapping(object):
     """A unified, optionally transformed, mapping view over multiple instances.
 
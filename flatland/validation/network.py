@@ -70,6 +70,9 @@ class IsEmail(Validator):
     domain_pattern = re.compile('^(?:[a-z0-9\\-]+\\.)*[a-z0-9\\-]+$',
                                 re.IGNORECASE)
 
+    pure = True
+    commutative = True
+
     def validate(self, element, state):
         addr = element.u
         if addr.count(u'@') != 1:
@@ -165,6 +168,9 @@ class URLValidator(Validator):
     allowed_parts = set(_url_parts)
     urlparse = urlparse
 
+    pure = True
+    commutative = True
+
     def validate(self, element, state):
         if element.value is None:
             return self.note_error(element, state, 'bad_format')
@@ -254,6 +260,9 @@ class HTTPURLValidator(Validator):
     forbidden_parts = dict(username=True, password=True)
     urlparse = urlparse
 
+    pure = True
+    commutative = True
+
     def validate(self, element, state):
         url = element.value
         if url is None:
@@ -320,6 +329,8 @@ class URLCanonicalizer(Validator):
     discard_parts = 'fragment',
     urlparse = urlparse
 
+    pure = True
+
     def validate(self, element, state):
         if not self.discard_parts:
             return True
@@ -9,6 +9,8 @@ import six
 class NANPnxx(Validator):
     """Integer"""
 
+    pure = True
+
     def validate(self, element, state):
         if element.value is None:
             return False
@@ -76,6 +78,9 @@ class Luhn10(Validator):
 
     invalid = N_('The %(label)s was not entered correctly.')
 
+    pure = True
+    commutative = True
+
     def validate(self, element, state):
         num = element.value
         if num is None:
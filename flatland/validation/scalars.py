@@ -94,6 +94,8 @@ class ValueIn(Validator):
 
     valid_options = ()
 
+    commutative = True
+
     def __init__(self, valid_options=Unspecified, **kw):
         Validator.__init__(self, **kw)
         if valid_options is not Unspecified:
@@ -172,6 +174,8 @@ class ShorterThan(Validator):
 
     maxlength = 0
 
+    commutative = True
+
     def __init__(self, maxlength=Unspecified, **kw):
         Validator.__init__(self, **kw)
         if maxlength is not Unspecified:
@@ -221,6 +225,8 @@ class LongerThan(Validator):
 
     minlength = 0
 
+    commutative = True
+
     def __init__(self, minlength=Unspecified, **kw):
         Validator.__init__(self, **kw)
         if minlength is not Unspecified:
@@ -278,6 +284,8 @@ class LengthBetween(Validator):
     minlength = 0
     maxlength = 0
 
+    commutative = True
+
     def __init__(self, minlength=Unspecified, maxlength=Unspecified, **kw):
         Validator.__init__(self, **kw)
         if minlength is not Unspecified:
@@ -320,6 +328,8 @@ class ValueLessThan(Validator):
 
     failure = N_(u'%(label)s must be less than %(boundary)s.')
 
+    commutative = True
+
     def __init__(self, boundary, **kw):
         Validator.__init__(self, **kw)
         self.boundary = boundary
@@ -358,6 +368,8 @@ class ValueAtMost(Validator):
 
     failure = N_(u'%(label)s must be less than or equal to %(maximum)s.')
 
+    commutative = True
+
     def __init__(self, maximum, **kw):
         Validator.__init__(self, **kw)
         self.maximum = maximum
@@ -396,6 +408,8 @@ class ValueGreaterThan(Validator):
 
     failure = N_(u'%(label)s must be greater than %(boundary)s.')
 
+    commutative = True
+
     def __init__(self, boundary, **kw):
         Validator.__init__(self, **kw)
         self.boundary = boundary
@@ -434,6 +448,8 @@ class ValueAtLeast(Validator):
 
     failure = N_(u'%(label)s must be greater than or equal to %(minimum)s.')
 
+    commutative = True
+
     def __init__(self, minimum, **kw):
         Validator.__init__(self, **kw)
         self.minimum = minimum
@@ -495,6 +511,8 @@ class ValueBetween(Validator):
 
     inclusive = True
 
+    commutative = True
+
     def __init__(self, minimum, maximum, **kw):
         Validator.__init__(self, **kw)
         self.minimum = minimum
@@ -15,6 +15,8 @@ class NANPphone(Validator):
     fmt_line = u'(%03i) %03i-%04i'
     fmt_ext = fmt_line + ' x%i'
 
+    pure = True
+
     def __init__(self, extensions=False, **kw):
         Validator.__init__(self, **kw)
         self.extensions = extensions
@@ -1,4 +1,19 @@
+import sys
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py as _build_py
+
+
+class build_py(_build_py):
+    """Leave out modules written in syntax this Python can not compile."""
+
+    def find_package_modules(self, package, package_dir):
+        modules = _build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 5):
+            # async/await; only imported on Python 3.5 and later
+            modules = [module for module in modules
+                       if module[:2] != ('flatland.schema', 'asyncsupport')]
+        return modules
 
 
 setup(name="flatland0",
@@ -16,4 +31,5 @@ setup(name="flatland0",
       install_requires=[
           'blinker', 'six',
       ],
+      cmdclass={'build_py': build_py},
       )
@@ -122,3 +122,24 @@ def test_stack_plain_push_pop():
     with pytest.raises(RuntimeError):
 
         ctx.pop()
+
+
+def test_stack_nested_frames():
+    ctx = Context()
+    first, second = list(_default_context.keys())[:2]
+    base = ctx[first], ctx[second]
+
+    ctx.push(**{first: 1})
+    ctx.push()
+    ctx[first] = 2
+    ctx[first] = 3
+    ctx.push(**{second: 4})
+    assert (ctx[first], ctx[second]) == (3, 4)
+
+    ctx.pop()
+    assert (ctx[first], ctx[second]) == (3, base[1])
+    ctx.pop()
+    assert ctx[first] == 1
+    ctx.pop()
+    assert (ctx[first], ctx[second]) == base
+
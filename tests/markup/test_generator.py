@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import io
+
 from flatland import String
 from flatland.out.markup import Generator
 
@@ -96,3 +98,92 @@ def test(xmlgen, el, markup_impl):
     xmlgen['markup_wrapper'] = markup_impl
     expected = """<label><x></label>"""
     assert xmlgen.label(contents=markup_impl(u'<x>')) == expected
+
+
+def test_attribute_order_and_escaping(xmlgen):
+    got = xmlgen.tag(u'x', zed=u'"1" & <2>', value=u'v', class_=u'c',
+                     type=u'a', plain=u'p')
+    assert got == (u'<x type="a" value="v" class="c" plain="p" '
+                   u'zed="&quot;1&quot; &amp; &lt;2&gt;" />')
+
+
+def test_render_to(xmlgen, el):
+    chunks = []
+    with xmlgen.render_to(chunks.append):
+        assert xmlgen.write(xmlgen.form.open(el)) == u''
+        assert xmlgen.write(u'a < b') == u''
+        xmlgen.write(xmlgen['markup_wrapper'](u'<br />'))
+        assert xmlgen.input(el) == u'<input name="field1" value="val" />'
+        xmlgen.write(xmlgen.input(el))
+        xmlgen.write(xmlgen.textarea.open())
+        xmlgen.write(xmlgen.textarea.close())
+        xmlgen.write(xmlgen.form.close())
+    assert u''.join(chunks) == (
+        u'<form name="field1">a &lt; b<br />'
+        u'<input name="field1" value="val" /><textarea></textarea></form>')
+    assert xmlgen.write(u'&') == u'&amp;'
+
+    out = io.StringIO()
+    with xmlgen.render_to(out):
+        xmlgen.write(xmlgen.tag(u'p')())
+    assert out.getvalue() == u'<p />'
+
+
+def test_render_to_composed(xmlgen, el):
+    chunks = []
+    with xmlgen.render_to(chunks.append):
+        xmlgen.write(xmlgen.label(contents=xmlgen.input(el)))
+        stored = xmlgen.tag(u'b', contents=u'y')
+        both = xmlgen.input(el) + stored
+        xmlgen.write(xmlgen.tag(u'div', contents=both))
+        xmlgen.write(stored)
+    assert u''.join(chunks) == (
+        u'<label><input name="field1" value="val" /></label>'
+        u'<div><input name="field1" value="val" /><b>y</b></div>'
+        u'<b>y</b>')
+
+
+def test_skeleton_cache(xmlgen):
+    from flatland.out import generic
+    xmlgen.push(auto_domid=True, auto_for=True, auto_tabindex=True,
+                tabindex=1)
+    first, second = String.named(u's')(u'one'), String.named(u's')(u'two')
+
+    assert xmlgen.input(first) == (
+        u'<input name="s" value="one" id="f_s" tabindex="1" />')
+    assert xmlgen.input(second) == (
+        u'<input name="s" value="two" id="f_s" tabindex="2" />')
+    assert xmlgen.label(second) == u'<label for="f_s" />'
+    assert xmlgen.label(first, contents=u'x') == (
+        u'<label for="f_s">x</label>')
+    assert xmlgen.input(first, id=u'x') == (
+        u'<input name="s" value="one" id="x" tabindex="3" />')
+
+    pipeline = generic._pipeline(u'label', xmlgen)
+    static, fragments, dynamic, opening = generic._skeleton(
+        pipeline, u'label', {}, xmlgen, first)
+    assert static == {u'for': u'f_s'}
+    assert opening == u'<label for="f_s"'
+    assert generic._skeleton(
+        pipeline, u'label', {}, xmlgen, second)[0] is static
+
+    xmlgen[u'domid_format'] = u'g_%s'
+    assert xmlgen.label(first) == u'<label for="g_s" />'
+    xmlgen.pop()
+    assert xmlgen.input(first) == u'<input name="s" value="one" />'
+
+
+def test_skeleton_cache_settings(xmlgen):
+    from flatland.out import generic
+    el = String.named(u's')(u'one')
+
+    # a lone static transform before a dynamic one is not worth caching
+    pipeline = generic._pipeline(u'input', xmlgen)
+    assert generic._skeleton(pipeline, u'input', {}, xmlgen, el) is None
+
+    # unordered attributes keep the order of the transforms
+    xmlgen.push(auto_domid=True, ordered_attributes=False)
+    pipeline = generic._pipeline(u'input', xmlgen)
+    assert generic._skeleton(pipeline, u'input', {}, xmlgen, el) is None
+    assert xmlgen.input(el) == u'<input name="s" value="one" id="f_s" />'
+    xmlgen.pop()
@@ -730,3 +730,25 @@ def test_filter_want():
     expected = {}
     assert_bound_transform(generic.transform_filters,
                            u'horse', given, expected, context=context)
+
+
+def test_compiled_pipelines():
+    context = Context()
+    context[u'auto_domid'] = True
+    bind = schema(123)
+
+    pipeline = generic._pipeline(u'div', context)
+    assert pipeline == ()
+    assert generic._pipeline(u'div', context) is pipeline
+    assert generic.transform_domid in [
+        fn for fn, body, dynamic in generic._pipeline(u'input', context)]
+
+    attributes = {}
+    generic.transform(u'input', attributes, None, context, bind)
+    assert attributes == {u'name': u'number', u'value': u'123',
+                          u'id': u'f_number'}
+
+    # toggles on the tag itself still apply
+    attributes = {u'auto_domid': u'off', u'auto_for': u'on'}
+    generic.transform(u'div', attributes, None, context, bind)
+    assert attributes == {u'for': u'f_number'}
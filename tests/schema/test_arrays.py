@@ -73,6 +73,26 @@ def test_set_flat_anonymous_dict():
         schema.from_flat(pairs)
 
 
+def test_set_flat_members_parented():
+    schema = Array.named(u'a').of(Integer.named(u'i'))
+    el = schema.from_flat([(u'a_i', u'1'), (u'a_i_x', u'2'), (u'a_i', u'3')])
+
+    assert el.value == [1, None, 3]
+    assert all(member.parent is el for member in el)
+
+
+def test_set_flat_custom_member():
+    class Doubled(Integer):
+        def _set_flat(self, pairs, sep):
+            for key, value in pairs:
+                if key == self.name:
+                    self.set(int(value) * 2)
+
+    schema = Array.named(u'a').of(Doubled.named(u'i'))
+    el = schema.from_flat([(u'a_i', u'1'), (u'a_i', u'3')])
+    assert el.value == [2, 6]
+
+
 def test_set():
     schema = Array.of(Integer)
     el = schema()
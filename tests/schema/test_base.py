@@ -6,6 +6,7 @@ from flatland import (
     SkipAll,
     SkipAllFalse,
     Unevaluated,
+    Unset,
 )
 
 from tests._util import requires_unicode_coercion
@@ -154,6 +155,54 @@ def test_message_buckets():
     assert el.warnings == ['warning']
 
 
+def test_message_buckets_lazy():
+    el = Element()
+    assert 'errors' not in el.__dict__
+    assert 'warnings' not in el.__dict__
+    assert el.errors == [] and el.errors is el.errors
+
+
+def test_compacted():
+    import gc
+    from flatland import Dict, Integer, List, String
+
+    def has_dict(el):
+        return any(type(ref) is dict for ref in gc.get_referents(el))
+
+    schema = Dict.named(u'd').of(
+        String.named(u's').using(default=u'z'),
+        List.named(u'l').of(Integer.named(u'i'))).compacted()
+    assert schema.name == u'd'
+    assert schema.field_schema[0].__slots__
+
+    el = schema.from_flat([(u'd_s', u'x'), (u'd_l_0_i', u'1')])
+    assert el.validate()
+    assert el.value == {u's': u'x', u'l': [1]}
+    leaf = el[u'l'][0]
+    assert leaf.raw == u'1' and leaf.valid is True
+    assert leaf.parent.parent is el[u'l']
+    assert not has_dict(leaf)
+
+    unset = schema.field_schema[0].named(u't')()
+    assert (unset.value, unset.u, unset.valid) == (None, u'', Unevaluated)
+    assert unset.name == u't'
+    assert not has_dict(unset)
+
+    leaf.add_error(u'bad')
+    leaf.properties[u'p'] = 1
+    assert leaf.errors == [u'bad']
+    assert leaf.properties == {u'p': 1}
+
+    el.reset()
+    assert el[u's'].value is None and el[u's'].raw is Unset
+    assert el[u's'].valid is Unevaluated
+
+    copied = schema.from_defaults()
+    assert copied.value == {u's': u'z', u'l': []}
+    assert copied[u's'].parent is copied
+    assert schema.from_defaults()[u's'] is not copied[u's']
+
+
 def test_validation():
     ok = lambda item, data: True
     not_ok = lambda item, data: False
@@ -233,6 +282,35 @@ def test_validator_return():
             el.validate()
 
 
+def test_validation_plan():
+    from flatland import Dict, String
+
+    calls = []
+
+    class Custom(String):
+        def _validate(self, state, descending):
+            calls.append(descending)
+            return String._validate(self, state, descending)
+
+    schema = Dict.of(String.named(u'a'), Custom.named(u'b'))
+    el = schema({u'a': u'x', u'b': u'y'})
+    assert el.validate()
+    assert calls == [True, False]
+    assert el[u'a'].valid and el[u'b'].valid
+    # containers without descent validators are Unevaluated going down
+    assert schema._validation_plan[1:] == (True, False, False)
+    assert schema.field_schema[1]._validation_plan[1:] == (False, True, True)
+
+    el = schema.descent_validated_by(lambda el, state: SkipAllFalse)()
+    assert not el.validate()
+    assert el[u'a'].valid is Unevaluated
+
+    # instance overrides are honored
+    el = Element(validators=(lambda el, state: False,),
+                 validates_down='validators')
+    assert not el.validate()
+
+
 def test_default_value():
     el = Element()
     assert el.default_value is None
@@ -249,3 +327,222 @@ def test_default_value():
     # a default_factory may reference el.default
     el = Element(default='mno', default_factory=lambda x: x.default)
     assert el.default_value == 'mno'
+
+
+def test_from_defaults_prototype():
+    from flatland import Dict, Integer, List, String
+
+    schema = Dict.named(u'd').of(
+        String.named(u's').using(default=u'x'),
+        List.named(u'l').of(Integer.named(u'i')).using(default=2))
+    first, second = schema.from_defaults(), schema.from_defaults()
+    assert first is not second
+    assert first.value == second.value == {u's': u'x', u'l': [None, None]}
+
+    first[u's'].set(u'changed')
+    first[u'l'].append(3)
+    first[u's'].add_error(u'bad')
+    assert second[u's'].value == u'x'
+    assert second[u's'].errors == []
+    assert len(second[u'l']) == 2
+    assert second[u'l'][1].parent.parent is second[u'l']
+    assert second[u'l'][1].flattened_name() == u'd_l_1_i'
+
+    counter = []
+    factory = String.using(default_factory=lambda el: len(counter))
+    assert factory.from_defaults().value == u'0'
+    counter.append(1)
+    assert factory.from_defaults().value == u'1'
+
+
+def test_from_defaults_custom_init():
+    calls = []
+
+    class Counted(Element):
+        def __init__(self, *args, **kw):
+            calls.append(1)
+            Element.__init__(self, *args, **kw)
+
+        def set_default(self):
+            pass
+
+    Counted.from_defaults()
+    Counted.from_defaults()
+    assert len(calls) == 2
+
+
+def test_from_defaults_custom_adapt():
+    from flatland import String
+    from flatland.schema.base import _clonable
+
+    adapted = []
+
+    class Recorded(String):
+        def adapt(self, value):
+            adapted.append(value)
+            return String.adapt(self, value)
+
+    schema = Recorded.using(default=u'x')
+    schema.from_defaults()
+    schema.from_defaults()
+    assert adapted == [u'x', u'x']
+
+    assert _clonable(String.named(u's').using(default=u'x'))
+    assert not _clonable(String.using(serialize=lambda el, value: value))
+
+
+def test_incremental_validation():
+    from flatland import Dict, List, String
+
+    calls = []
+
+    def record(element, state):
+        calls.append(element.name)
+        return element.value != u'bad'
+
+    schema = Dict.named(u'd').of(
+        String.named(u'a').validated_by(record),
+        String.named(u'b').validated_by(record),
+        List.named(u'l').of(String.named(u'i').validated_by(record)),
+    ).validated_by(record)
+    el = schema({u'a': u'x', u'b': u'bad', u'l': [u'y']})
+
+    assert not el.validate(incremental=True)
+    assert sorted(calls) == [u'a', u'b', u'd', u'i']
+    del calls[:]
+
+    # nothing changed
+    assert not el.validate(incremental=True)
+    assert calls == []
+    assert el[u'b'].valid is False
+
+    el[u'b'].set(u'fixed')
+    assert el.validate(incremental=True)
+    assert calls == [u'b', u'd']
+    assert el[u'b'].valid is True
+    del calls[:]
+
+    el[u'l'].append(u'bad')
+    assert not el.validate(incremental=True)
+    assert calls == [u'i', u'd']
+    assert el[u'l'][1].valid is False
+    del calls[:]
+
+    el[u'l'].pop()
+    assert el.validate(incremental=True)
+    assert calls == [u'd']
+
+    el.reset()
+    assert el[u'l'].__dict__.get('_snapshot') is None
+
+
+def test_incremental_validation_messages():
+    from flatland import Dict, String
+    from flatland.validation import Present
+
+    def whole(element, state):
+        if element[u'a'].value == u'bad':
+            element.add_error(u'whole failed')
+            return False
+        return True
+
+    schema = Dict.named(u'd').of(
+        String.named(u'a').validated_by(Present()),
+        String.named(u'b').validated_by(Present()),
+    ).validated_by(whole).using(descent_validators=[
+        lambda element, state: element.add_warning(u'descended') or True])
+    el = schema({u'a': u'', u'b': u''})
+    assert not el.validate(incremental=True)
+    assert el[u'a'].errors == [u'a may not be blank.']
+
+    el[u'a'].set(u'abcde')
+    assert not el.validate(incremental=True)
+    assert el[u'a'].valid is True
+    assert el[u'a'].errors == []
+    assert el[u'b'].errors == [u'b may not be blank.']
+
+    el[u'a'].set(u'bad')
+    el[u'b'].set(u'x')
+    assert not el.validate(incremental=True)
+    assert el.errors == [u'whole failed']
+
+    el[u'a'].set(u'good')
+    assert el.validate(incremental=True)
+    assert el.errors == []
+    assert el.warnings == [u'descended']
+
+
+def test_detached_validation():
+    from flatland import Dict, String, ValidationResult
+    from flatland.validation import Present
+
+    class State(object):
+        def __init__(self, forbidden):
+            self.forbidden = forbidden
+
+    def forbid(element, state):
+        if element.value == state.forbidden:
+            element.add_warning(u'careful')
+            element.add_error(u'forbidden')
+            return False
+        return True
+
+    schema = Dict.of(String.named(u'a').validated_by(Present(), forbid),
+                     String.named(u'b').validated_by(Present()))
+    el = schema({u'a': u'x'})
+
+    first = el.validate(State(u'x'), detached=True)
+    second = el.validate(State(u'y'), detached=True)
+    assert isinstance(first, ValidationResult)
+    assert not first and not second
+
+    a, b = el[u'a'], el[u'b']
+    assert first.is_valid(a) is False and second.is_valid(a) is True
+    assert first.errors(a) == [u'forbidden']
+    assert first.warnings(a) == [u'careful']
+    assert second.errors(a) == []
+    assert second.errors(b) == first.errors(b) == [u'b may not be blank.']
+    assert first.is_valid(el) is True
+
+    # the tree is untouched
+    for element in el, a, b:
+        assert element.valid is Unevaluated
+        assert element.errors == [] and element.warnings == []
+
+    first.apply()
+    assert a.valid is False
+    assert a.errors == [u'forbidden']
+    assert b.errors == [u'b may not be blank.']
+
+    assert a.validate(State(u'z'), recurse=False, detached=True)
+
+    with pytest.raises(TypeError):
+        el.validate(detached=True, incremental=True)
+
+
+def test_detached_validation_leaves_tree_untouched():
+    from flatland import Dict, String
+
+    def named(element, state):
+        element.add_error(element.flattened_name() + u' ' + u''.join(
+            element.errors))
+        return False
+
+    schema = Dict.named(u'd').of(
+        Dict.named(u'inner').of(
+            String.named(u'a').validated_by(named),
+            String.named(u'b')).using(lazy_fields=True))
+    el = schema()
+    inner = el[u'inner']
+    assert dict.__len__(inner) == 0
+
+    result = el.validate(detached=True)
+    assert not result
+    # deferred fields are created up front, but nothing else is kept
+    a = inner[u'a']
+    assert result.errors(a) == [u'd_inner_a ']
+    for element in [el] + list(el.all_children):
+        assert u'errors' not in element.__dict__
+        assert u'warnings' not in element.__dict__
+        assert element._path_cache is None
+        assert element.valid is Unevaluated
@@ -319,6 +319,68 @@ def test_naming_dict_dict():
         assert root.el([u'd2', u's']) is leaf
 
 
+def test_naming_after_reparenting():
+    schema = Dict.named(u'd').of(Dict.named(u'd2').of(String.named(u's')))
+    root, other = schema(), schema()
+    leaf = root[u'd2'][u's']
+    assert leaf.root is root
+    assert leaf.fq_name() == u'.d2.s'
+    assert leaf.flattened_name() == u'd_d2_s'
+
+    root[u'd2'].parent = None
+    assert leaf.root is root[u'd2']
+    assert leaf.fq_name() == u'.s'
+    assert leaf.flattened_name() == u'd2_s'
+
+    root[u'd2'].parent = other[u'd2']
+    assert leaf.root is other
+    assert leaf.fq_name() == u'.d2.d2.s'
+    assert leaf.flattened_name(u'.') == u'd.d2.d2.s'
+
+
+def test_naming_after_reparenting_root():
+    schema = Dict.named(u'd').of(Dict.named(u'e').of(String.named(u's')))
+    root, other = schema(), Dict.named(u'o').of(schema)()
+    leaf = root[u'e'][u's']
+    assert leaf.fq_name() == u'.e.s'
+
+    root.parent = other
+    assert leaf.root is other
+    assert leaf.fq_name() == u'.d.e.s'
+    assert leaf.flattened_name() == u'o_d_e_s'
+
+    members = List.named(u'l').of(Dict.named(u'd').of(String.named(u's')))
+    listed = members([{}])
+    leaf = listed[0][u's']
+    assert leaf.flattened_name() == u'l_0_d_s'
+    listed.parent = other
+    assert leaf.flattened_name() == u'o_l_0_d_s'
+
+    # followed through parents that don't list them as children
+    stray = String.named(u'z')()
+    stray.parent = leaf
+    assert stray.flattened_name() == u'o_l_0_d_s_z'
+    listed.insert(0, {})
+    assert stray.flattened_name() == u'o_l_1_d_s_z'
+
+
+def test_naming_list_renumbered():
+    schema = List.named(u'l').of(Dict.named(u'd').of(String.named(u's')))
+    root = schema([{}, {}])
+    leaf = root[1][u's']
+    assert leaf.fq_name() == u'.1.s'
+    assert leaf.flattened_name() == u'l_1_d_s'
+
+    root.insert(0, {})
+    assert leaf.fq_name() == u'.2.s'
+    assert leaf.flattened_name() == u'l_2_d_s'
+
+    del root[:2]
+    assert leaf.fq_name() == u'.0.s'
+    assert leaf.flattened_name() == u'l_0_d_s'
+    assert leaf.root is root
+
+
 def test_naming_list():
     for name, root_flat, leaf_flat in ((u'l', u'l', u'l_0_s'),
                                        (None, u'', u'0_s')):
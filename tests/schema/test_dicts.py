@@ -673,3 +673,41 @@ def test_sparsedict_flattening():
     for el in els:
         got = sorted(el.flatten())
         assert wanted == got
+
+
+def test_lazy_fields():
+    schema = Dict.named(u'd').of(String.named(u'x'),
+                                 Integer.named(u'y'),
+                                 String.named(u'z')).using(lazy_fields=True)
+    el = schema.from_flat([(u'd_y', u'1')])
+    assert dict.__len__(el) == 1
+    assert len(el) == 3
+    assert u'x' in el and u'w' not in el
+
+    x = el[u'x']
+    assert x.parent is el
+    assert dict.__len__(el) == 2
+    with pytest.raises(KeyError):
+        el[u'w']
+
+    assert list(el.keys()) == [u'x', u'y', u'z']
+    assert el[u'x'] is x
+    assert el.value == {u'x': None, u'y': 1, u'z': None}
+    assert el.flatten() == [(u'd_x', u''), (u'd_y', u'1'), (u'd_z', u'')]
+
+    el.set({u'z': u'set'})
+    assert dict.__len__(el) == 1
+    assert el.value == {u'x': None, u'y': None, u'z': u'set'}
+
+
+def test_lazy_fields_reparented():
+    schema = Dict.named(u'd').of(String.named(u'x'),
+                                 String.named(u'y')).using(lazy_fields=True)
+    outer = Dict.named(u'o').of(schema)()
+    el = outer[u'd']
+    x = el[u'x']
+    assert x.flattened_name() == u'o_d_x'
+
+    el.parent = None
+    assert dict.__len__(el) == 1
+    assert x.flattened_name() == u'd_x'
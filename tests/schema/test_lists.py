@@ -447,3 +447,15 @@ def test_value():
     schema = List.of(String)
     el = schema([u'x', u'x'])
     assert el.value == [u'x', u'x']
+
+
+def test_iter_flatten():
+    schema = List.named(u'l').of(List.named(u'm').of(Integer.named(u'i')))
+    el = schema([[1, 2], [3]])
+
+    pairs = el.iter_flatten()
+    assert not isinstance(pairs, list)
+    assert list(pairs) == el.flatten() == [
+        (u'l_0_m_0_i', u'1'), (u'l_0_m_1_i', u'2'), (u'l_1_m_0_i', u'3')]
+    assert list(el[0].iter_flatten(sep=u'.', value=lambda e: e.value)) == [
+        (u'l.0.m.0.i', 1), (u'l.0.m.1.i', 2)]
@@ -0,0 +1,81 @@
+from flatland import (
+    Dict,
+    ElementPool,
+    Integer,
+    List,
+    SparseDict,
+    String,
+    Unevaluated,
+    Unset,
+)
+
+import pytest
+
+
+def _schema():
+    return Dict.named(u'd').of(
+        String.named(u's'),
+        List.named(u'l').of(Integer.named(u'i')))
+
+
+def test_reset():
+    el = _schema()()
+    s = el[u's']
+    el.set_flat([(u'd_s', u'x'), (u'd_l_0_i', u'1'), (u'd_l_1_i', u'y')])
+    el.validate()
+    el[u'l'].add_error(u'bad')
+    s.properties[u'seen'] = True
+    assert el.value == {u's': u'x', u'l': [1, None]}
+    assert s.valid
+
+    el.reset()
+    assert el[u's'] is s
+    assert el.value == {u's': None, u'l': []}
+    assert s.raw is Unset and s.u == u''
+    assert el.raw is Unset
+    assert s.valid is Unevaluated and el[u'l'].valid is Unevaluated
+    assert el[u'l'].errors == []
+    assert dict(s.properties) == {}
+    assert el.flatten() == _schema()().flatten()
+
+
+def test_reset_sparse():
+    schema = SparseDict.of(String.named(u'a'),
+                           String.named(u'b')).using(minimum_fields='required')
+    schema.field_schema[1].optional = True
+    el = schema({u'a': u'x', u'b': u'y'})
+    el.reset()
+    assert list(el.keys()) == [u'a']
+    assert el[u'a'].value is None
+
+
+def test_pool():
+    schema = _schema()
+    pool = ElementPool(schema, maxsize=1)
+    with pool.element() as el:
+        el.set({u's': u'x'})
+    assert len(pool) == 1
+
+    again = pool.acquire()
+    assert again is el
+    assert again.value == {u's': None, u'l': []}
+    other = pool.acquire()
+    assert other is not el
+
+    pool.release(again)
+    pool.release(other)
+    assert len(pool) == 1
+
+    with pytest.raises(TypeError):
+        pool.release(String())
+    with pytest.raises(TypeError):
+        pool.release(el[u's'])
+
+    with pytest.raises(TypeError):
+        pool.release(again)
+    assert len(pool) == 1
+    assert pool.acquire() is again
+    assert pool.acquire() is not again
+
+    pool.clear()
+    assert len(pool) == 0
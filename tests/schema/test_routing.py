@@ -0,0 +1,194 @@
+from flatland import (
+    Dict,
+    Integer,
+    List,
+    SparseDict,
+    String,
+)
+from flatland.schema.routing import (
+    FieldTrie,
+    consume,
+    field_trie,
+    name_tokens,
+    parse_flat,
+    routes_flat,
+)
+
+import sys
+
+import pytest
+
+
+def test_trie_matches_separated_names():
+    fields = (String.named(u'a'), String.named(u'a_b'), String.named(u'c'))
+    trie = FieldTrie(fields, u'_')
+
+    def owners(key):
+        return [(schema.name, end)
+                for _, schema, end in trie.match(key.split(u'_'), 0)]
+
+    assert owners(u'a') == [(u'a', 1)]
+    assert owners(u'a_b') == [(u'a', 1), (u'a_b', 2)]
+    assert owners(u'a_b_c') == [(u'a', 1), (u'a_b', 2)]
+    assert owners(u'ab') == []
+    assert owners(u'c_x') == [(u'c', 1)]
+    assert owners(u'x') == []
+
+
+def test_trie_cached_per_class_and_sep():
+    schema = Dict.of(String.named(u'x'), String.named(u'y'))
+    el, other = schema(), schema()
+
+    assert field_trie(el, u'_') is field_trie(other, u'_')
+    assert field_trie(el, u'.') is not field_trie(el, u'_')
+
+
+def test_name_tokens():
+    assert name_tokens(u'first_name', u'_') == (u'first', u'name')
+    assert name_tokens(u'first_name', u'.') == (u'first_name',)
+    assert (name_tokens(u'first_name', u'_') is
+            name_tokens(u'first_name', u'_'))
+
+
+def test_consume():
+    path = [u'f', u'rows', u'0']
+    assert consume(path, 0, (u'f',)) == 1
+    assert consume(path, 1, (u'rows', u'0')) == 3
+    assert consume(path, 1, (u'rows', u'0', u'x')) is None
+    assert consume(path, 0, (u'g',)) is None
+    assert consume(path, 2, None) == 2
+
+
+def test_parse_flat():
+    pairs = [(u'f_a', 1), (u'g_a', 2), (u'f', 3), (u'x', 4)]
+    assert list(parse_flat(pairs, u'f', u'_')) == [([u'f', u'a'], 1, 1),
+                                                   ([u'f'], 1, 3)]
+    assert len(list(parse_flat(pairs, None, u'_'))) == 4
+
+
+def test_nested_routing():
+    schema = Dict.named(u'f').of(
+        String.named(u'first_name'),
+        Dict.named(u'first').of(String.named(u'name')),
+        List.named(u'rows').of(Dict.of(Integer.named(u'n'),
+                                       String.named(u'label'))))
+    el = schema.from_flat([(u'f_first_name', u'Biff'),
+                           (u'f_first_name_x', u'ignored'),
+                           (u'f_rows_1_n', u'2'),
+                           (u'f_rows_0_n', u'1'),
+                           (u'f_rows_0_label', u'one'),
+                           (u'g_first_name', u'ignored')])
+    assert el[u'first_name'].value == u'Biff'
+    assert el[u'first'][u'name'].value == u'Biff'
+    assert el[u'rows'].value == [{u'n': 1, u'label': u'one'},
+                                 {u'n': 2, u'label': None}]
+
+
+def test_routing_custom_sep():
+    schema = Dict.named(u'f').of(List.named(u'l').of(String.named(u's')))
+    el = schema()
+    el.set_flat([(u'f.l.0.s', u'a'), (u'f.l.1.s', u'b')], sep=u'.')
+    assert el.value == {u'l': [u'a', u'b']}
+
+
+def test_routing_sparse_dict():
+    schema = SparseDict.named(u's').of(Integer.named(u'x'),
+                                       Integer.named(u'y'))
+    el = schema.from_flat([(u's_y', u'2')])
+    assert list(el.keys()) == [u'y']
+    assert el[u'y'].parent is el
+
+
+def test_custom_set_flat_receives_pairs():
+    received = []
+
+    class Recorder(String):
+        def _set_flat(self, pairs, sep):
+            pairs = list(pairs)
+            received.extend(pairs)
+            String._set_flat(self, pairs, sep)
+
+    assert not routes_flat(Recorder)
+    assert routes_flat(String)
+
+    schema = Dict.named(u'f').of(
+        List.named(u'l').of(Recorder.named(u'r')),
+        Recorder.named(u'solo'))
+    el = schema.from_flat([(u'f_l_0_r', u'a'),
+                           (u'f_solo', u'b'),
+                           (u'f_solo_extra', u'c')])
+    assert el.value == {u'l': [u'a'], u'solo': u'b'}
+    assert sorted(received) == [(u'r', u'a'),
+                                (u'solo', u'b'),
+                                (u'solo_extra', u'c')]
+
+
+def test_loader_matches_set_flat():
+    schema = Dict.named(u'f').of(
+        String.named(u'first_name'),
+        List.named(u'rows').of(Dict.of(Integer.named(u'n'))),
+        SparseDict.named(u's').of(Integer.named(u'x'), Integer.named(u'y')))
+    pairs = [(u'f_rows_3_n', u'3'),
+             (u'f_s_y', u'2'),
+             (u'f_first_name', u'Biff'),
+             (u'f_rows_1_n', u'1'),
+             (u'f_s_x', u'1'),
+             (u'g_first_name', u'ignored')]
+
+    expected = schema.from_flat(pairs)
+    el = schema()
+    with el.flat_loader() as loader:
+        for key, value in pairs:
+            loader.feed(key, value)
+        assert el[u'first_name'].value == u'Biff'
+        assert el[u'rows'].value == []
+    assert el.value == expected.value
+    assert el.flatten() == expected.flatten()
+    assert list(el[u's'].keys()) == [u'x', u'y']
+    assert el[u'rows'][1].parent.parent is el[u'rows']
+
+
+def test_loader_list_limits():
+    schema = List.named(u'l').of(String).using(maximum_set_flat_members=2)
+    el = schema()
+    loader = el.flat_loader()
+    loader.update({u'l_5': u'c', u'l_1': u'a', u'l_3': u'b'})
+    loader.close()
+    assert el.value == [u'a', u'b']
+
+    el = schema.using(prune_empty=False)()
+    with el.flat_loader() as loader:
+        loader.update([(u'l_5', u'c'), (u'l_1', u'a')])
+    assert el.value == [None, u'a']
+
+
+@pytest.mark.skipif(not hasattr(sys, 'set_int_max_str_digits'),
+                    reason="no integer string conversion limit")
+def test_loader_oversized_index():
+    schema = List.named(u'l').of(String)
+    oversized = u'1' * (sys.get_int_max_str_digits() + 1)
+    el = schema.from_flat([(u'l_' + oversized, u'x'), (u'l_0', u'y')])
+    assert el.value == [u'y']
+
+
+def test_loader_closed():
+    el = String.named(u's')()
+    with el.flat_loader() as loader:
+        loader.feed(u's', u'x')
+    loader.close()
+    with pytest.raises(RuntimeError):
+        loader.feed(u's', u'y')
+    assert el.value == u'x'
+
+
+def test_loader_custom_set_flat():
+    class Upper(String):
+        def set_flat(self, pairs, sep=u'_'):
+            String.set_flat(self, [(key, value.upper())
+                                   for key, value in pairs], sep)
+
+    el = Upper.named(u'u')()
+    with el.flat_loader() as loader:
+        loader.feed(u'u', u'abc')
+        loader.feed(u'v', u'def')
+    assert el.value == u'ABC'
@@ -184,3 +184,43 @@ def test_symbol_pickle():
             rt = pickle.loads(serial)
             assert rt is sym1
             assert rt is sym2
+
+
+@pytest.fixture
+def interning():
+    cache = util.cloned_classes
+    cache.clear()
+    cache.maxsize = 2
+    try:
+        yield cache
+    finally:
+        cache.maxsize = 0
+        cache.clear()
+
+
+def test_class_cloner_interning(interning):
+    from flatland import Dict, Integer, String
+
+    assert String.named(u'a') is String.named(u'a')
+    assert String.named(u'a') is not Integer.named(u'a')
+    assert String.using(optional=True) is not String.using(optional=1)
+    assert interning.stats()['hits'] == 2
+
+    schema = Dict.of(String.named(u'a'))
+    assert Dict.of(String.named(u'a')) is schema
+    assert schema().el(u'a').name == u'a'
+
+    # unhashable arguments are never interned
+    assert String.using(validators=[]) is not String.using(validators=[])
+
+    stats = interning.stats()
+    assert stats['size'] == stats['maxsize'] == 2
+    assert stats['evictions'] > 0
+
+
+def test_class_cloner_interning_disabled():
+    from flatland import String
+
+    assert not util.cloned_classes.maxsize
+    assert String.named(u'a') is not String.named(u'a')
+    assert len(util.cloned_classes) == 0
@@ -1,14 +1,25 @@
+import sys
+
 from flatland import (
     Dict,
     Form,
     Integer,
+    List,
+    SkipAll,
+    String,
+    Unevaluated,
     )
+from flatland.schema import base as base_schema
 from flatland.validation import (
     Converted,
+    NANPphone,
     Present,
     Validator,
+    base,
     )
 
+import pytest
+
 
 class Age(Integer):
 
@@ -98,3 +109,385 @@ def test_nested_validation():
 
     form.el('d2.x2').set(2)
     assert form.validate()
+
+
+requires_asyncio = pytest.mark.skipif(
+    sys.version_info < (3, 5), reason='requires async/await support')
+
+
+def run_async(awaitable):
+    """Run *awaitable* in a new event loop."""
+    import asyncio
+    if hasattr(asyncio, 'run'):
+        return asyncio.run(awaitable)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+@requires_asyncio
+def test_validate_async():
+    import asyncio
+
+    gate = []
+    calls = []
+
+    def waits(element, state):
+        calls.append(element.name)
+        gate.append(asyncio.get_event_loop().create_future())
+        return gate[0]
+
+    def opens(element, state):
+        calls.append(element.name)
+        asyncio.get_event_loop().call_soon(gate[0].set_result, True)
+        return asyncio.sleep(0, result=False)
+
+    def skips(element, state):
+        calls.append(element.name)
+        return asyncio.sleep(0, result=SkipAll)
+
+    schema = Dict.named(u'd').of(
+        Integer.named(u'a').validated_by(waits, Present()),
+        Integer.named(u'b').validated_by(opens, Present()),
+        Dict.named(u'c').of(Integer.named(u'x')).descent_validated_by(skips))
+    el = schema({u'a': 1, u'b': 2})
+
+    valid = run_async(asyncio.wait_for(el.validate_async(), 1))
+
+    assert valid is False
+    # a level's validators all start before any are awaited
+    assert calls == [u'a', u'b', u'c']
+    assert el[u'a'].valid is True
+    assert el[u'b'].valid is False
+    assert el[u'c'].valid is True
+    assert el[u'c'][u'x'].valid is Unevaluated
+    assert el.valid is True
+
+
+@requires_asyncio
+def test_validate_awaits_synchronously():
+    import asyncio
+
+    def later(element, state):
+        return asyncio.sleep(0, result=element.value > 1)
+
+    el = Integer(validators=(later,))
+    el.set(2)
+    assert el.validate()
+    el.set(1)
+    assert not el.validate()
+    # one event loop serves each thread
+    loop = base_schema._context.loop
+    assert el.validate() is False
+    assert base_schema._context.loop is loop
+
+    # validate() can't run awaitables from within a running event loop
+    def nested(element, state):
+        return el.validate()
+
+    outer = Integer(validators=(nested,))
+    outer.set(1)
+    with pytest.raises(RuntimeError) as raised:
+        run_async(outer.validate_async())
+    assert 'validate_async' in str(raised.value)
+
+
+def test_batch_validation():
+    from flatland import List, String
+
+    class Known(Validator):
+        unknown = u'%(value)s is unknown.'
+
+        def __init__(self, **kw):
+            Validator.__init__(self, **kw)
+            self.batches = []
+
+        def validate_batch(self, elements, state):
+            self.batches.append([el.value for el in elements])
+            return [el.value in state or
+                    self.note_error(el, state, 'unknown')
+                    for el in elements]
+
+    known = Known()
+    trailing = []
+    schema = List.named(u'rows').of(
+        String.named(u'code').validated_by(
+            Present(), known,
+            lambda el, state: trailing.append(el.value) or True))
+    el = schema([u'a', u'b', u'', u'zz'])
+
+    assert not el.validate(set([u'a', u'b']))
+    assert known.batches == [[u'a', u'b', u'zz']]
+    assert trailing == [u'a', u'b']
+    assert [row.valid for row in el] == [True, True, False, False]
+    assert el[3].errors == [u'zz is unknown.']
+
+    # outside of a recursive validate(), batches hold a single element
+    assert el[0].validate(set([u'a']), recurse=False) is True
+    assert known.batches[-1] == [u'a']
+
+
+def test_batch_validation_result_count():
+    from flatland import List, String
+
+    class Short(Validator):
+
+        def validate_batch(self, elements, state):
+            return [True] * (len(elements) - 1)
+
+    schema = List.named(u'rows').of(String.named(u'code').validated_by(Short()))
+    el = schema([u'a', u'b'])
+    with pytest.raises(ValueError) as raised:
+        el.validate()
+    assert '1 results for 2 elements' in str(raised.value)
+
+
+def test_blocking_validators_on_executor():
+    from flatland import List, String
+    futures = pytest.importorskip('concurrent.futures')
+    import threading
+    if not hasattr(threading, 'Barrier'):
+        pytest.skip('threading.Barrier requires Python 3.2 or later')
+
+    barrier = threading.Barrier(2, timeout=5)
+    release = threading.Event()
+    main = threading.current_thread()
+
+    class Lookup(Validator):
+        blocking = True
+        missing = u'%(value)s not found.'
+
+        def validate(self, element, state):
+            assert threading.current_thread() is not main
+            if element.value == u'slow':
+                release.wait(5)
+                return True
+            barrier.wait()
+            self.note_warning(element, state, message=u'looked up')
+            return element.value == u'ok' or self.note_error(
+                element, state, 'missing')
+
+    schema = List.named(u'l').of(
+        String.named(u's').validated_by(Lookup()).using(
+            timeout_message=u'too slow'))
+    el = schema([u'ok', u'gone', u'slow'])
+
+    with futures.ThreadPoolExecutor(max_workers=3) as executor:
+        try:
+            valid = el.validate(executor=executor, timeout=0.5)
+        finally:
+            release.set()
+
+    assert not valid
+    assert [e.valid for e in el] == [True, False, False]
+    assert el[0].errors == [] and el[0].warnings == [u'looked up']
+    assert el[1].errors == [u'gone not found.']
+    assert el[2].errors == [u'too slow']
+
+    # without an executor, blocking validators run in place
+    with pytest.raises(AssertionError):
+        el[0].validate()
+
+
+def test_incremental_batch_validation():
+    from flatland import List, String
+
+    class Known(Validator):
+
+        def __init__(self, **kw):
+            Validator.__init__(self, **kw)
+            self.batches = []
+
+        def validate_batch(self, elements, state):
+            self.batches.append([el.value for el in elements])
+            return [el.value in state for el in elements]
+
+    known = Known()
+    schema = List.named(u'rows').of(String.named(u'code').validated_by(known))
+    el = schema([u'a', u'b', u'zz'])
+    state = set([u'a', u'b'])
+
+    assert not el.validate(state, incremental=True)
+    assert known.batches == [[u'a', u'b', u'zz']]
+
+    el[1].set(u'c')
+    el[2].set(u'a')
+    assert not el.validate(state, incremental=True)
+    assert known.batches[-1] == [u'c', u'a']
+    assert [row.valid for row in el] == [True, False, True]
+
+
+def test_incremental_validation_on_executor():
+    from flatland import List, String
+    futures = pytest.importorskip('concurrent.futures')
+    import threading
+
+    main = threading.current_thread()
+    ran = []
+
+    class Lookup(Validator):
+        blocking = True
+
+        def validate(self, element, state):
+            ran.append(threading.current_thread() is not main)
+            return True
+
+    schema = List.named(u'l').of(String.named(u's').validated_by(Lookup()))
+    el = schema([u'a', u'b'])
+    with futures.ThreadPoolExecutor(max_workers=2) as executor:
+        assert el.validate(incremental=True, executor=executor)
+        el[0].set(u'c')
+        assert el.validate(incremental=True, executor=executor)
+    assert ran == [True, True, True]
+
+
+def test_pure_validators_memoized():
+    calls = []
+
+    class Odd(Validator):
+        pure = True
+        even = u'%(label)s must be odd.'
+
+        def validate(self, element, state):
+            calls.append(element.value)
+            return element.value % 2 == 1 or self.note_error(
+                element, state, 'even')
+
+    class Counting(Odd):
+        def validate(self, element, state):
+            calls.append(element.value)
+            return True
+
+    schema = Dict.of(Integer.named(u'a').validated_by(Odd()),
+                     Integer.named(u'b').validated_by(Odd()),
+                     Integer.named(u'c').validated_by(Odd(even=u'no')),
+                     Integer.named(u'd').validated_by(Counting()))
+    el = schema({u'a': 2, u'b': 2, u'c': 2, u'd': 2})
+
+    base.memo.clear()
+    assert not el.validate()
+    # b shares a's result; c's messages are configured differently
+    assert calls == [2, 2, 2]
+    assert el[u'a'].errors == [u'a must be odd.']
+    assert el[u'b'].errors == [u'b must be odd.']
+    assert el[u'c'].errors == [u'no']
+    assert el[u'd'].valid
+
+    el[u'b'].set(3)
+    assert not el.validate()
+    assert calls == [2, 2, 2, 3, 2]
+    assert el[u'b'].valid
+
+    try:
+        base.memo.maxsize = 0
+        assert not el.validate()
+        assert len(calls) == 9
+    finally:
+        base.memo.maxsize = 1024
+
+
+def test_memoized_validators_replay_changes():
+    schema = List.named(u'phones').of(
+        String.named(u'phone').validated_by(NANPphone()))
+    el = schema([u'5035551212', u'5035551212', u'x'])
+
+    base.memo.clear()
+    assert not el.validate()
+    assert el.value == [u'(503) 555-1212', u'(503) 555-1212', u'x']
+    assert [e.valid for e in el] == [True, True, False]
+    assert el[1].u == u'(503) 555-1212'
+    assert base.memo.stats()['hits'] == 1
+
+
+def test_bounded_validation():
+    calls = []
+
+    def positive(element, state):
+        calls.append(element.name)
+        return element.value > 0
+
+    schema = Dict.named(u'd').of(
+        Integer.named(u'a').validated_by(positive),
+        Integer.named(u'b').validated_by(positive),
+        Dict.named(u'c').of(Integer.named(u'x').validated_by(positive)))
+    el = schema({u'a': -1, u'b': -1, u'c': {u'x': -1}})
+
+    assert not el.validate(max_errors=2)
+    assert el.truncated
+    assert el.valid is False
+    assert calls == [u'a', u'b']
+    assert el[u'a'].valid is False and el[u'b'].valid is False
+    assert el[u'c'].valid is Unevaluated
+    assert el[u'c'][u'x'].valid is Unevaluated
+
+    del calls[:]
+    el.set({u'a': 1, u'b': 1, u'c': {u'x': 1}})
+    assert el.validate(max_errors=1)
+    assert not el.truncated
+    assert calls == [u'a', u'b', u'x']
+
+    del calls[:]
+    assert not el.validate(deadline=0)
+    assert el.truncated
+    assert calls == []
+    assert el[u'c'][u'x'].valid is Unevaluated
+
+    with pytest.raises(TypeError):
+        el.validate(incremental=True, max_errors=1)
+    with pytest.raises(TypeError):
+        el.validate(detached=True, deadline=1)
+
+    el.reset()
+    assert not el.truncated
+
+
+def test_adaptive_validator_order(monkeypatch):
+    calls = []
+    now = [0.0]
+    monkeypatch.setattr(base_schema, '_clock', lambda: now[0])
+
+    def checker(name, passes, cost=0.001, commutative=True):
+        def check(element, state):
+            calls.append(name)
+            now[0] += cost
+            return passes
+        check.commutative = commutative
+        return check
+
+    validators = (checker(u'first', True, commutative=False),
+                  checker(u'slow', False, cost=1.0),
+                  checker(u'passes', True),
+                  checker(u'fails', False),
+                  checker(u'last', False, commutative=False))
+    schema = String.using(adaptive_validation=True).validated_by(*validators)
+    monkeypatch.setattr(base_schema, 'reorder_interval', 4)
+    for _ in range(4):
+        schema(u'x').validate()
+    assert calls[:2] == [u'first', u'slow']
+
+    # unmeasured validators are tried next, then the cheap failure wins
+    del calls[:]
+    schema(u'x').validate()
+    assert calls == [u'first', u'passes', u'fails']
+    for _ in range(10):
+        schema(u'x').validate()
+
+    del calls[:]
+    schema(u'x').validate()
+    assert calls == [u'first', u'fails']
+    # the plain schema keeps its declared order
+    del calls[:]
+    String.validated_by(*validators)(u'x').validate()
+    assert calls == [u'first', u'slow']
+
+
+def test_adaptive_chains_bounded(monkeypatch):
+    monkeypatch.setattr(base_schema, 'chains_per_class', 2)
+    schema = String.using(adaptive_validation=True)
+    for count in range(5):
+        el = schema(u'x')
+        el.validators = [lambda element, state: True] * (count + 1)
+        el.validate()
+    assert len(base_schema._chains[schema]) == 2